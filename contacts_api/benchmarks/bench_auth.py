@@ -0,0 +1,74 @@
+"""
+Benchmark of the per-request authentication cost.
+
+Compares resolving the current user from an access token with a cold
+token/user cache (``jwt.decode`` + users query on every request, the old
+behaviour) against the cached path. The users query is replaced by a stub
+that sleeps for ``--db-latency`` ms, so the numbers show CPU cost plus a
+configurable database round trip.
+
+Run from the ``contacts_api`` directory::
+
+    python benchmarks/bench_auth.py --requests 20000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from contacts_api.services.auth import auth_service, token_cache  # noqa: E402
+from contacts_api.services.user_cache import user_cache  # noqa: E402
+
+
+class FakeUser:
+    id = 1
+    email = "bench@example.com"
+    username = "bench"
+    is_verified = True
+    avatar = None
+
+
+async def run(requests: int, db_latency: float, cache_tokens: bool, cache_users: bool) -> float:
+    async def get_user_by_email(email, db):
+        if db_latency:
+            await asyncio.sleep(db_latency / 1000)
+        return FakeUser()
+
+    token = await auth_service.create_access_token({"sub": FakeUser.email})
+    token_cache.clear()
+    user_cache.clear()
+    with patch("contacts_api.services.auth.repository_users.get_user_by_email", get_user_by_email):
+        started = time.perf_counter()
+        for _ in range(requests):
+            if not cache_tokens:
+                token_cache.clear()
+            if not cache_users:
+                user_cache.clear()
+            await auth_service.get_current_user(token, db=None)
+        return (time.perf_counter() - started) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--db-latency", type=float, default=0.0, help="simulated users query latency, ms")
+    args = parser.parse_args()
+
+    baseline = asyncio.run(run(args.requests, args.db_latency, cache_tokens=False, cache_users=False))
+    print(f"{'no caches':<22}{baseline * 1e6:9.1f} us/request")
+    for label, cache_tokens, cache_users in (
+        ("token cache", True, False),
+        ("token + user cache", True, True),
+    ):
+        cost = asyncio.run(run(args.requests, args.db_latency, cache_tokens, cache_users))
+        print(f"{label:<22}{cost * 1e6:9.1f} us/request  ({baseline / cost:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
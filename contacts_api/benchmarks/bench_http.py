@@ -0,0 +1,379 @@
+"""
+End-to-end HTTP load benchmark of the API routes.
+
+Drives the real ``contacts_api.main:app`` either in-process (httpx over
+ASGI, no sockets) or through a local uvicorn started for the run. The
+database is seeded first with verified users and their contacts. Then
+each route is hit ``--requests`` times by ``--concurrency`` concurrent
+clients, one route after another. Each client owns its own users, so
+refresh-token rotation and deletes never collide between clients.
+
+Reports throughput and p50/p95/p99 latency per route as JSON (``--output``)
+and as a table on stderr. With ``--baseline`` it compares against an
+earlier JSON and exits with status 1 if a route's p95 regressed by more
+than ``--tolerance``.
+
+Point it at a throwaway database: ``--reset`` drops and recreates all
+tables. Without ``--database-url`` a fresh SQLite file is used. Rate
+limiting is switched off. Signup and login costs are dominated by bcrypt
+(``BCRYPT_ROUNDS``). Reads are mostly served from the response cache,
+as in production.
+
+Run from the ``contacts_api`` directory::
+
+    python benchmarks/bench_http.py --output head.json
+    python benchmarks/bench_http.py --mode uvicorn --workers 4 --concurrency 32
+    python benchmarks/bench_http.py --database-url postgresql://postgres@localhost/contacts_bench --reset
+    python benchmarks/bench_http.py --baseline head.json --tolerance 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+PASSWORD = "secret123"
+ROUTES = ("signup", "login", "refresh", "create", "read", "list", "update", "delete")
+
+
+@dataclass
+class BenchUser:
+    email: str
+    access_token: str = ""
+    refresh_token: str = ""
+    contact_ids: list[int] = field(default_factory=list)
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+
+def contact_body(i: int, **overrides) -> dict:
+    body = {
+        "name": f"Contact {i:06d}",
+        "email": f"contact{i}@example.com",
+        "phone": f"+380{i % 10**9:09d}",
+        "birthday": date(1960 + i % 45, 1 + i % 12, 1 + i % 28).isoformat(),
+        "about": "Met at a conference in Lviv" if i % 3 else None,
+    }
+    return {**body, **overrides}
+
+
+def configure(args):
+    """
+    Environment for the app; must run before ``contacts_api`` is imported.
+    """
+    tmp = tempfile.mkdtemp(prefix="bench_http_")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["RATE_LIMIT_STORAGE_URI"] = "memory://"
+    os.environ.setdefault("RESPONSE_CACHE_GENERATIONS", f"sqlite:///{os.path.join(tmp, 'generations.db')}")
+    os.environ.setdefault("MEDIA_ROOT", os.path.join(tmp, "media"))
+
+
+def seed(users: int, contacts: int, reset: bool) -> list[BenchUser]:
+    from sqlalchemy import insert, select
+
+    from contacts_api import models
+    from contacts_api.crud import contact_values
+    from contacts_api.database import Base, engine
+    from contacts_api.schemas import ContactCreate
+    from contacts_api.services.auth import auth_service
+
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    run = int(time.time())
+    emails = [f"bench-{run}-{i}@example.com" for i in range(users)]
+    password = asyncio.run(auth_service.get_password_hash(PASSWORD))
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            dict(username=f"bench{i:05d}", email=email, password=password, is_verified=True)
+            for i, email in enumerate(emails)
+        ])
+        owner_ids = conn.execute(select(models.User.id).where(models.User.email.in_(emails))).scalars().all()
+        rows = [
+            contact_values(ContactCreate(**contact_body(n)), owner_id)
+            for owner_id in owner_ids for n in range(contacts)
+        ]
+        for start in range(0, len(rows), 5000):
+            conn.execute(insert(models.Contacts), rows[start:start + 5000])
+    engine.dispose()
+    return [BenchUser(email) for email in emails]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    ms = sorted(latency * 1000 for latency in latencies)
+    if len(ms) < 2:
+        ms = ms * 2 or [0.0, 0.0]
+    q = statistics.quantiles(ms, n=100, method="inclusive")
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(q[49], 3),
+        "p95_ms": round(q[94], 3),
+        "p99_ms": round(q[98], 3),
+        "max_ms": round(ms[-1], 3),
+    }
+
+
+async def phase(client: httpx.AsyncClient, clients: list[list[BenchUser]], total: int, step) -> dict:
+    """
+    ``total`` requests built by ``step(users, i)`` spread over the clients.
+
+    ``step`` returns ``(method, url, kwargs, on_response)`` or None when the
+    client has nothing left to do.
+    """
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def run_client(users):
+        nonlocal errors
+        for i in counter:
+            request = step(users, i)
+            if request is None:
+                return
+            method, url, kwargs, on_response = request
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+            elif on_response is not None:
+                on_response(response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(users) for users in clients))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def steps(run: int) -> dict:
+    def pick(users, i) -> BenchUser:
+        return users[i % len(users)]
+
+    def store_tokens(user):
+        def on_response(response):
+            tokens = response.json()
+            user.access_token, user.refresh_token = tokens["access_token"], tokens["refresh_token"]
+        return on_response
+
+    def signup(users, i):
+        body = {"username": f"load{i:011d}"[-16:], "email": f"load-{run}-{i}@example.com", "password": PASSWORD}
+        return "POST", "/auth/signup", {"json": body}, None
+
+    def login(users, i):
+        user = pick(users, i)
+        return "POST", "/auth/login", {"data": {"username": user.email, "password": PASSWORD}}, store_tokens(user)
+
+    def refresh(users, i):
+        user = pick(users, i)
+        headers = {"Authorization": f"Bearer {user.refresh_token}"}
+        return "GET", "/auth/refresh_token", {"headers": headers}, store_tokens(user)
+
+    def create(users, i):
+        user = pick(users, i)
+        return "POST", "/contacts/", {"json": contact_body(i, name=f"Load {i:06d}"), "headers": user.headers}, (
+            lambda response: user.contact_ids.append(response.json()["id"])
+        )
+
+    def read(users, i):
+        user = pick(users, i)
+        contact_id = user.contact_ids[i % len(user.contact_ids)]
+        return "GET", f"/contacts/{contact_id}", {"headers": user.headers}, None
+
+    def list_page(users, i):
+        user = pick(users, i)
+        return "GET", "/contacts/", {"params": {"limit": 50}, "headers": user.headers}, None
+
+    def update(users, i):
+        user = pick(users, i)
+        contact_id = user.contact_ids[i % len(user.contact_ids)]
+        body = contact_body(i, name=f"Updated {i:06d}")
+        return "PUT", f"/contacts/{contact_id}", {"json": body, "headers": user.headers}, None
+
+    def delete(users, i):
+        user = next((user for user in users if user.contact_ids), None)
+        if user is None:
+            return None
+        return "DELETE", f"/contacts/{user.contact_ids.pop()}", {"headers": user.headers}, None
+
+    return {
+        "signup": signup, "login": login, "refresh": refresh, "create": create,
+        "read": read, "list": list_page, "update": update, "delete": delete,
+    }
+
+
+async def for_each_user(client: httpx.AsyncClient, clients: list[list[BenchUser]], step):
+    """
+    Unmeasured ``step`` once for every user (each client walks its own users).
+    """
+    async def run_client(users):
+        for n, user in enumerate(users):
+            method, url, kwargs, on_response = step([user], n)
+            response = await client.request(method, url, **kwargs)
+            response.raise_for_status()
+            if on_response is not None:
+                on_response(response)
+
+    await asyncio.gather(*(run_client(users) for users in clients))
+
+
+async def run_routes(client: httpx.AsyncClient, users: list[BenchUser], args) -> dict:
+    clients = [users[k::args.concurrency] for k in range(args.concurrency)]
+    route_steps = steps(int(time.time()))
+    await for_each_user(client, clients, route_steps["login"])
+
+    results = {}
+    for route in args.routes:
+        total = args.requests
+        if route == "delete":
+            # a client that runs out of contacts drops the index it drew
+            total = sum(len(user.contact_ids) for user in users) + len(clients)
+        if route in ("read", "update") and not all(user.contact_ids for user in users):
+            # reads and updates target contacts created in this run
+            await for_each_user(client, clients, route_steps["create"])
+        results[route] = await phase(client, clients, total, route_steps[route])
+        print(f"{route:<8}{json.dumps(results[route])}", file=sys.stderr)
+    return results
+
+
+async def run_asgi(users: list[BenchUser], args) -> dict:
+    from contacts_api.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            return await run_routes(client, users, args)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_uvicorn(users: list[BenchUser], args) -> dict:
+    port = free_port()
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT / "src"), os.getenv("PYTHONPATH")]))}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "contacts_api.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=env,
+    )
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60, limits=limits) as client:
+            for _ in range(300):
+                if server.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+                try:
+                    await client.get("/openapi.json")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not start in 30 s")
+            return await run_routes(client, users, args)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for route, current in results["routes"].items():
+        before = baseline.get("routes", {}).get(route)
+        if not before or not before["p95_ms"]:
+            continue
+        change = current["p95_ms"] / before["p95_ms"] - 1
+        print(f"{route:<8} p95 {before['p95_ms']:9.2f} -> {current['p95_ms']:9.2f} ms ({change:+.0%})", file=sys.stderr)
+        if change > tolerance:
+            regressions.append(route)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--database-url", help="sync URL as in DATABASE_URL; default is a fresh SQLite file")
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    parser.add_argument("--users", type=int, default=50, help="seeded users")
+    parser.add_argument("--contacts", type=int, default=200, help="seeded contacts per user")
+    parser.add_argument("--requests", type=int, default=500, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--routes", nargs="+", choices=ROUTES, default=list(ROUTES))
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare p95 against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 regression (0.2 = 20%%)")
+    args = parser.parse_args()
+    if args.users < args.concurrency:
+        parser.error("--users must be at least --concurrency (each client owns its users)")
+
+    configure(args)
+    from sqlalchemy.engine import make_url
+
+    started = time.perf_counter()
+    users = seed(args.users, args.contacts, args.reset)
+    print(f"seeded {args.users} users x {args.contacts} contacts in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+
+    runner = run_asgi if args.mode == "asgi" else run_uvicorn
+    routes = asyncio.run(runner(users, args))
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "mode": args.mode,
+            "workers": args.workers if args.mode == "uvicorn" else None,
+            "database": make_url(os.environ["DATABASE_URL"]).get_backend_name(),
+            "users": args.users,
+            "contacts_per_user": args.contacts,
+            "requests_per_route": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+        },
+        "routes": routes,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        regressions = compare(report, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if regressions:
+            print(f"p95 regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark of the per-check rate limiter overhead.
+
+Measures ``limiter.hit`` (what slowapi runs for every limited request) with
+the sliding-window-counter strategy on each storage backend, spread over
+``--keys`` distinct clients. Then starts ``--processes`` worker processes
+that hammer a single key and reports how many hits were allowed in total:
+with a shared storage it is the limit, with ``memory://`` it is the limit
+times the number of processes.
+
+Run from the ``contacts_api`` directory::
+
+    python benchmarks/bench_limiter.py --checks 20000
+    python benchmarks/bench_limiter.py --redis redis://localhost:6379
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from limits import parse  # noqa: E402
+from limits.storage import storage_from_string  # noqa: E402
+from limits.strategies import SlidingWindowCounterRateLimiter  # noqa: E402
+
+import contacts_api.utils.limiter_storage  # noqa: E402,F401
+
+
+def per_check(uri: str, checks: int, keys: int) -> float:
+    storage = storage_from_string(uri)
+    storage.reset()
+    limiter = SlidingWindowCounterRateLimiter(storage)
+    item = parse("1000000/minute")
+    started = time.perf_counter()
+    for i in range(checks):
+        limiter.hit(item, f"user:{i % keys}")
+    return (time.perf_counter() - started) / checks
+
+
+def hammer(uri: str, limit: str, hits: int, allowed):
+    limiter = SlidingWindowCounterRateLimiter(storage_from_string(uri))
+    item = parse(limit)
+    allowed.put(sum(limiter.hit(item, "user:shared") for _ in range(hits)))
+
+
+def shared_total(uri: str, processes: int, limit: str, hits: int) -> int:
+    storage_from_string(uri).reset()
+    allowed = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=hammer, args=(uri, limit, hits, allowed)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    total = sum(allowed.get() for _ in workers)
+    for worker in workers:
+        worker.join()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--checks", type=int, default=20000)
+    parser.add_argument("--keys", type=int, default=1000, help="distinct clients")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--limit", default="50/minute")
+    parser.add_argument("--redis", help="also benchmark this redis:// URI (needs the redis package)")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    uris = {
+        "memory": "memory://",
+        "sqlite (disk)": f"sqlite:///{os.path.join(tmp, 'ratelimit.db')}",
+    }
+    if os.path.isdir("/dev/shm"):
+        uris["sqlite (/dev/shm)"] = f"sqlite:////dev/shm/bench_ratelimit_{os.getpid()}.db"
+    if args.redis:
+        uris["redis"] = args.redis
+
+    print(f"{'storage':<20}{'per check':>12}{f'allowed of {args.limit} x{args.processes}':>30}")
+    for label, uri in uris.items():
+        cost = per_check(uri, args.checks, args.keys)
+        total = shared_total(uri, args.processes, args.limit, parse(args.limit).amount * 2)
+        print(f"{label:<20}{cost * 1e6:9.1f} us{total:>30}")
+
+    for path in Path("/dev/shm").glob(f"bench_ratelimit_{os.getpid()}.db*"):
+        path.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark of the per-page cost of rendering a contact listing.
+
+Compares three ways of turning a page of contacts into a JSON body:
+
+* ``response_model`` — ORM objects returned from the route, re-validated
+  against ``ContactPage`` and dumped with ``json`` by FastAPI (the path
+  before the response cache);
+* ``pydantic json`` — ORM objects, ``ContactPage.model_validate`` and
+  ``model_dump_json`` (the default cached path);
+* ``rows + orjson`` — plain rows with only the response columns and
+  ``orjson.dumps`` (``FAST_SERIALIZATION=true``).
+
+Fetch (query + row/object construction) and serialization are timed
+separately on a seeded SQLite database.
+
+Run from the ``contacts_api`` directory::
+
+    python benchmarks/bench_serialization.py --pages 500
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("RESPONSE_CACHE_GENERATIONS", "memory://")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from contacts_api import crud, models, schemas  # noqa: E402
+from contacts_api.database import Base  # noqa: E402
+from contacts_api.utils.serialization import contact_page_json  # noqa: E402
+
+PAGE_FIELD = create_model_field(name="Response_list_contacts", type_=schemas.ContactPage, mode="serialization")
+
+
+async def render_response_model(items, next_cursor) -> bytes:
+    content = await serialize_response(field=PAGE_FIELD, response_content={"items": items, "next_cursor": next_cursor})
+    return JSONResponse(content).body
+
+
+async def render_pydantic(items, next_cursor) -> bytes:
+    page = schemas.ContactPage.model_validate({"items": items, "next_cursor": next_cursor}, from_attributes=True)
+    return page.model_dump_json().encode()
+
+
+async def render_orjson(rows, next_cursor) -> bytes:
+    return contact_page_json(rows, next_cursor)
+
+
+PATHS = {
+    "response_model": (False, render_response_model),
+    "pydantic json": (False, render_pydantic),
+    "rows + orjson": (True, render_orjson),
+}
+
+
+async def seed(session_factory, contacts: int):
+    async with session_factory() as db:
+        user = models.User(username="bench", email="bench@example.com", password="x")
+        db.add(user)
+        await db.flush()
+        await db.execute(insert(models.Contacts), [
+            dict(
+                name=f"Contact {i:06d}", email=f"contact{i}@example.com", phone=f"+380{i:09d}",
+                birthday=date(1970 + i % 40, 1 + i % 12, 1 + i % 28), about="Met at a conference" if i % 3 else None,
+                owner_id=user.id,
+            )
+            for i in range(contacts)
+        ])
+        await db.commit()
+        return user.id
+
+
+async def measure(session_factory, user_id: int, limit: int, pages: int, as_rows: bool, render) -> tuple[float, float, int]:
+    fetch = serialize = 0.0
+    size = 0
+    for _ in range(pages):
+        async with session_factory() as db:
+            started = time.perf_counter()
+            items, next_cursor = await crud.get_contacts_page(db, user_id, limit=limit, as_rows=as_rows)
+            fetched = time.perf_counter()
+            body = await render(items, next_cursor)
+            serialize += time.perf_counter() - fetched
+            fetch += fetched - started
+            size = len(body)
+    return fetch / pages, serialize / pages, size
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--contacts", type=int, default=5000)
+    parser.add_argument("--pages", type=int, default=300, help="pages rendered per path and page size")
+    parser.add_argument("--limits", type=int, nargs="+", default=[10, 50, 100])
+    args = parser.parse_args()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    user_id = await seed(session_factory, args.contacts)
+
+    print(f"{'path':<18}{'limit':>6}{'fetch':>12}{'serialize':>12}{'total':>12}{'bytes':>8}")
+    for limit in args.limits:
+        for label, (as_rows, render) in PATHS.items():
+            await measure(session_factory, user_id, limit, 10, as_rows, render)
+            fetch, serialize, size = await measure(session_factory, user_id, limit, args.pages, as_rows, render)
+            print(
+                f"{label:<18}{limit:>6}{fetch * 1e6:9.0f} us{serialize * 1e6:9.0f} us"
+                f"{(fetch + serialize) * 1e6:9.0f} us{size:>8}"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,42 +1,443 @@
-from sqlalchemy.orm import Session
+from datetime import date, timedelta
+
+from sqlalchemy import String, bindparam, case, delete, func, insert, literal_column, or_, select, text, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from . import models, schemas
-from .schemas import ContactCreate, Contact 
-def get_contacts(db:Session,skip: int = 0, limit:int =100):
-    return db.query(models.Contacts).offset(skip).limit(limit).all()
+from .schemas import ContactCreate, Contact
+from .utils.pagination import decode_cursor, encode_cursor
+from .utils.response_cache import invalidate_owner
+
+# keyset columns for each supported ordering; id is always the tiebreaker
+KEYSET_ORDERINGS = {
+    "id": ("id",),
+    "name": ("name", "id"),
+}
+KEYSET_TYPES = {"id": int, "name": str}
+# fields of a contact response in schema order, then version for the ETag;
+# selected as plain rows by the fast serialization path
+CONTACT_ROW_COLUMNS = tuple(getattr(models.Contacts, field) for field in (*Contact.model_fields, "version"))
+# shorter queries contain no full trigram, so they only match word prefixes
+SEARCH_TRGM_MIN_LENGTH = 3
+
+
+def contact_entity(as_rows: bool) -> tuple:
+    return CONTACT_ROW_COLUMNS if as_rows else (models.Contacts,)
 
 
-def create_contact(body: ContactCreate, db: Session, current_user: models.User):
-    new_contact = models.Contacts(
+def birthday_month_day(birthday: date | None) -> int | None:
+    """
+    Значення колонки ``birthday_md`` (місяць * 100 + день) для дати народження.
+    """
+    if birthday is None:
+        return None
+    return birthday.month * 100 + birthday.day
+
+
+def contact_values(body: ContactCreate, owner_id: int) -> dict:
+    """
+    Значення колонок нового контакту; спільні для одиночного та пакетного вставлення.
+    """
+    return dict(
         name=body.name,
         email=body.email,
         phone=body.phone,
         birthday=body.birthday,
+        birthday_md=birthday_month_day(body.birthday),
         about=body.about,
-        owner_id=current_user.id 
+        owner_id=owner_id
     )
+
+
+async def create_contact(body: ContactCreate, db: AsyncSession, current_user: schemas.CurrentUser):
+    new_contact = models.Contacts(**contact_values(body, current_user.id))
     db.add(new_contact)
-    db.commit()
-    db.refresh(new_contact)
+    await db.commit()
+    await invalidate_owner(current_user.id)
+    await db.refresh(new_contact)
     return new_contact
 
 
-def get_contact(db: Session, contact_id: int):
-    return db.query(models.Contacts).filter(models.Contacts.id == contact_id).first()
+async def get_contact(db: AsyncSession, contact_id: int, owner_id: int | None = None):
+    query = select(models.Contacts).filter(models.Contacts.id == contact_id)
+    if owner_id is not None:
+        query = query.filter(models.Contacts.owner_id == owner_id)
+    result = await db.execute(query)
+    return result.scalars().first()
 
-def update_contact(db:Session,contact_id:int,contact:schemas.ContactCreate):
-    db_contact = db.query(models.Contacts).filter(models.Contacts.id==contact_id).first()
-    if db_contact:
-        for key, value in contact.dict().items():
-            setattr(db_contact,key,value)
-        db.commit()
-        db.refresh(db_contact)
+def owned_contact(contact_id: int, owner_id: int, versions: list[int] | None = None) -> tuple:
+    """
+    Умова WHERE для контакту власника; ``versions`` — допустимі версії з If-Match.
+    """
+    conditions = (models.Contacts.id == contact_id, models.Contacts.owner_id == owner_id)
+    if versions is not None:
+        conditions += (models.Contacts.version.in_(versions),)
+    return conditions
+
+async def get_contact_version(db: AsyncSession, contact_id: int, owner_id: int) -> int | None:
+    result = await db.execute(select(models.Contacts.version).where(*owned_contact(contact_id, owner_id)))
+    return result.scalar_one_or_none()
+
+async def update_contact(db: AsyncSession, contact_id: int, contact: schemas.ContactCreate, owner_id: int, versions: list[int] | None = None):
+    """
+    Оновлює контакт власника одним запитом ``UPDATE ... RETURNING``.
+
+    Перевірка власника (і версії з If-Match) — частина умови WHERE, тож окремий
+    SELECT не потрібен. Кожне оновлення збільшує ``version``.
+
+    Returns:
+        Contacts | None: Оновлений контакт або None, якщо його немає, він чужий чи версія не збіглася.
+    """
+    values = contact_values(contact, owner_id)
+    del values["owner_id"]
+    result = await db.execute(
+        update(models.Contacts)
+        .where(*owned_contact(contact_id, owner_id, versions))
+        .values(**values, version=models.Contacts.version + 1)
+        .returning(models.Contacts),
+        execution_options={"synchronize_session": False}
+    )
+    db_contact = result.scalars().first()
+    await db.commit()
+    if db_contact is not None:
+        await invalidate_owner(owner_id)
     return db_contact
 
-def delete_contact(db:Session,contact_id:int):
-    db_contact = db.query(models.Contacts).filter(models.Contacts.id==contact_id).first()
-    if db_contact:
-        db.delete(db_contact)
-        db.commit()
+async def patch_contact(db: AsyncSession, contact_id: int, changes: dict, owner_id: int, versions: list[int] | None = None):
+    """
+    Оновлює лише передані поля контакту і лише якщо вони справді змінилися.
+
+    До умови ``UPDATE`` додається ``поле IS DISTINCT FROM значення`` для кожного
+    поля, тож незмінений рядок не переписується (без зайвих записів у WAL та
+    індекси). Якщо нічого не змінилось, контакт просто читається.
+
+    Returns:
+        Contacts | None: Контакт після змін або None, якщо його немає, він чужий чи версія не збіглася.
+    """
+    owned = owned_contact(contact_id, owner_id, versions)
+    if changes:
+        values = dict(changes)
+        if "birthday" in values:
+            values["birthday_md"] = birthday_month_day(values["birthday"])
+        result = await db.execute(
+            update(models.Contacts)
+            .where(*owned, or_(*(getattr(models.Contacts, key).is_distinct_from(value) for key, value in changes.items())))
+            .values(**values, version=models.Contacts.version + 1)
+            .returning(models.Contacts),
+            execution_options={"synchronize_session": False}
+        )
+        db_contact = result.scalars().first()
+        if db_contact is not None:
+            await db.commit()
+            await invalidate_owner(owner_id)
+            return db_contact
+    result = await db.execute(select(models.Contacts).where(*owned))
+    return result.scalars().first()
+
+async def delete_contact(db: AsyncSession, contact_id: int, owner_id: int, versions: list[int] | None = None):
+    """
+    Видаляє контакт власника одним запитом ``DELETE ... RETURNING``.
+
+    Returns:
+        Contacts | None: Видалений контакт або None, якщо його немає, він чужий чи версія не збіглася.
+    """
+    result = await db.execute(
+        delete(models.Contacts)
+        .where(*owned_contact(contact_id, owner_id, versions))
+        .returning(models.Contacts),
+        execution_options={"synchronize_session": False}
+    )
+    db_contact = result.scalars().first()
+    await db.commit()
+    if db_contact is not None:
+        await invalidate_owner(owner_id)
     return db_contact
-def get_contacts_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Contacts).filter(models.Contacts.owner_id == user_id).offset(skip).limit(limit).all()
+
+async def get_contacts_by_ids(
+    db: AsyncSession, ids: list[int], owner_id: int, for_update: bool = False, as_rows: bool = False
+) -> dict:
+    """
+    Контакти власника за списком ID одним запитом.
+
+    З ``as_rows=True`` вибираються лише колонки відповіді (``CONTACT_ROW_COLUMNS``)
+    як рядки, без створення ORM-об'єктів.
+
+    Returns:
+        dict: ``{id: Contacts}``; чужих і неіснуючих ID у словнику немає.
+    """
+    query = select(*contact_entity(as_rows)).where(models.Contacts.owner_id == owner_id, models.Contacts.id.in_(ids))
+    if for_update:
+        query = query.with_for_update()
+    result = await db.execute(query)
+    return {contact.id: contact for contact in (result if as_rows else result.scalars())}
+
+async def bulk_update_contacts(db: AsyncSession, changes: dict, owner_id: int) -> dict:
+    """
+    Частково оновлює багато контактів власника в одній транзакції.
+
+    Рядки читаються одним запитом (на PostgreSQL з ``FOR UPDATE``), у них
+    змінюються лише поля, що відрізняються; під час flush ORM групує UPDATE
+    з однаковим набором колонок у один executemany.
+
+    Args:
+        changes (dict): ``{id: {поле: значення}}``.
+
+    Returns:
+        dict: ``{id: (статус, контакт)}``, статус — updated, unchanged або not_found.
+    """
+    contacts = await get_contacts_by_ids(db, list(changes), owner_id, for_update=True)
+    results = {}
+    for contact_id, fields in changes.items():
+        contact = contacts.get(contact_id)
+        if contact is None:
+            results[contact_id] = ("not_found", None)
+            continue
+        fields = {key: value for key, value in fields.items() if getattr(contact, key) != value}
+        if "birthday" in fields:
+            fields["birthday_md"] = birthday_month_day(fields["birthday"])
+        if fields:
+            fields["version"] = contact.version + 1
+        for key, value in fields.items():
+            setattr(contact, key, value)
+        results[contact_id] = ("updated" if fields else "unchanged", contact)
+    if any(status == "updated" for status, _ in results.values()):
+        await db.commit()
+        await invalidate_owner(owner_id)
+    return results
+
+async def bulk_delete_contacts(db: AsyncSession, ids: list[int], owner_id: int) -> list:
+    """
+    Видаляє контакти власника за списком ID одним ``DELETE ... RETURNING``.
+
+    Returns:
+        list: Видалені контакти.
+    """
+    result = await db.execute(
+        delete(models.Contacts)
+        .where(models.Contacts.owner_id == owner_id, models.Contacts.id.in_(ids))
+        .returning(models.Contacts),
+        execution_options={"synchronize_session": False}
+    )
+    deleted = result.scalars().all()
+    await db.commit()
+    if deleted:
+        await invalidate_owner(owner_id)
+    return deleted
+
+async def get_contacts_by_user(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100, as_rows: bool = False):
+    result = await db.execute(
+        select(*contact_entity(as_rows)).filter(models.Contacts.owner_id == user_id).offset(skip).limit(limit)
+    )
+    return result.all() if as_rows else result.scalars().all()
+
+
+async def get_contacts_page(
+    db: AsyncSession, user_id: int, limit: int = 100, cursor: str | None = None, order_by: str = "id", as_rows: bool = False
+):
+    """
+    Повертає сторінку контактів користувача з keyset-пагінацією.
+
+    Сторінка обирається умовою ``(ключі сортування) > (ключі з курсора)``
+    по індексу ``(owner_id, ...)``, тому будь-яка сторінка коштує як перша.
+
+    Args:
+        db (AsyncSession): Сесія бази даних.
+        user_id (int): ID власника контактів.
+        limit (int): Розмір сторінки.
+        cursor (str, optional): Курсор з попередньої сторінки.
+        order_by (str): Сортування: ``id`` або ``name``.
+        as_rows (bool): Вибрати лише колонки відповіді як рядки замість ORM-об'єктів.
+
+    Returns:
+        tuple: Список контактів і курсор наступної сторінки (або None).
+
+    Raises:
+        ValueError: якщо курсор пошкоджений або створений для іншого сортування.
+    """
+    keys = KEYSET_ORDERINGS[order_by]
+    columns = [getattr(models.Contacts, key) for key in keys]
+    query = select(*contact_entity(as_rows)).filter(models.Contacts.owner_id == user_id).order_by(*columns)
+    if cursor:
+        position = decode_cursor(cursor)
+        if position.get("o") != order_by or not all(isinstance(position.get(key), KEYSET_TYPES[key]) for key in keys):
+            raise ValueError("Invalid cursor")
+        query = query.filter(tuple_(*columns) > tuple_(*(position[key] for key in keys)))
+    result = await db.execute(query.limit(limit + 1))
+    contacts = result.all() if as_rows else result.scalars().all()
+    next_cursor = None
+    if len(contacts) > limit:
+        contacts = contacts[:limit]
+        last = contacts[-1]
+        next_cursor = encode_cursor({"o": order_by, **{key: getattr(last, key) for key in keys}})
+    return contacts, next_cursor
+
+
+async def bulk_create_contacts(db: AsyncSession, contacts: list[ContactCreate], user_id: int) -> int:
+    """
+    Вставляє пачку контактів однією транзакцією.
+
+    На PostgreSQL (psycopg) дані передаються через ``COPY ... FROM STDIN``,
+    на інших базах — одним багаторядковим ``INSERT``.
+
+    Args:
+        db (AsyncSession): Сесія бази даних.
+        contacts (list[ContactCreate]): Перевірені контакти.
+        user_id (int): ID власника.
+
+    Returns:
+        int: Кількість вставлених контактів.
+    """
+    if not contacts:
+        return 0
+    rows = [contact_values(body, user_id) for body in contacts]
+    conn = await db.connection()
+    if conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg":
+        columns = list(rows[0])
+        raw = await conn.get_raw_connection()
+        async with raw.driver_connection.cursor() as cursor:
+            async with cursor.copy(f"COPY {models.Contacts.__tablename__} ({', '.join(columns)}) FROM STDIN") as copy:
+                for row in rows:
+                    await copy.write_row([row[column] for column in columns])
+    else:
+        await db.execute(insert(models.Contacts), rows)
+    await db.commit()
+    await invalidate_owner(user_id)
+    return len(rows)
+
+
+async def stream_contacts_by_user(db: AsyncSession, user_id: int, columns: tuple, batch_size: int = 1000):
+    """
+    Потоково читає контакти користувача через серверний курсор.
+
+    Args:
+        db (AsyncSession): Сесія бази даних, що живе весь час читання.
+        user_id (int): ID власника.
+        columns (tuple): Назви колонок, які потрібно вибрати.
+        batch_size (int): Кількість рядків, що отримується з курсора за раз.
+
+    Yields:
+        list: Пачки рядків з вибраними колонками.
+    """
+    query = (
+        select(*(getattr(models.Contacts, column) for column in columns))
+        .filter(models.Contacts.owner_id == user_id)
+        .order_by(models.Contacts.id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await db.stream(query)
+    async for rows in result.partitions():
+        yield rows
+
+
+async def get_upcoming_birthdays(db: AsyncSession, user_id: int, days: int = 7, today: date | None = None):
+    """
+    Повертає контакти, у яких день народження в найближчі ``days`` днів.
+
+    Умова будується по ``birthday_md`` і враховує перехід через новий рік,
+    тому запит обходиться діапазоном індексу ``(owner_id, birthday_md)``.
+
+    Args:
+        db (AsyncSession): Сесія бази даних.
+        user_id (int): ID власника.
+        days (int): Кількість днів наперед, включно з сьогоднішнім
+            (``days=1`` — лише сьогодні).
+        today (date, optional): Дата відліку, за замовчуванням сьогодні.
+
+    Returns:
+        list: Контакти у порядку наближення дня народження.
+    """
+    if days <= 0:
+        return []
+    today = today or date.today()
+    column = models.Contacts.birthday_md
+    start = birthday_month_day(today)
+    # last day of the window, inclusive
+    end = birthday_month_day(today + timedelta(days=days - 1))
+    query = select(models.Contacts).filter(models.Contacts.owner_id == user_id)
+    if days >= 366:
+        query = query.filter(column.is_not(None))
+    elif start <= end:
+        query = query.filter(column.between(start, end))
+    else:
+        query = query.filter(or_(column >= start, column <= end))
+    query = query.order_by(case((column >= start, 0), else_=1), column, models.Contacts.id)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+def fts5_query(q: str) -> str:
+    """
+    Перетворює пошуковий рядок на запит FTS5: кожне слово в лапках і як префікс.
+    """
+    terms = [term.replace('"', '""') for term in q.split()]
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def tsquery_prefix(q: str) -> str:
+    """
+    Перетворює пошуковий рядок на запит ``to_tsquery``: кожне слово в лапках і як префікс.
+    """
+    terms = [term.replace("\\", "\\\\").replace("'", "''") for term in q.split()]
+    return " & ".join(f"'{term}':*" for term in terms)
+
+
+async def search_contacts(db: AsyncSession, user_id: int, q: str, limit: int = 20):
+    """
+    Повнотекстовий і нечіткий пошук по контактах користувача.
+
+    На PostgreSQL використовуються GIN-індекси ``(owner_id, tsvector)`` та
+    ``(owner_id, pg_trgm)`` (збіг слів, схожість і підрядок), на SQLite —
+    таблиця FTS5. Запити коротші за ``SEARCH_TRGM_MIN_LENGTH`` шукаються лише
+    за префіксом слова: з них не виходить жодної повної триграми.
+
+    Args:
+        db (AsyncSession): Сесія бази даних.
+        user_id (int): ID власника.
+        q (str): Пошуковий рядок.
+        limit (int): Максимальна кількість результатів.
+
+    Returns:
+        list: Контакти, відсортовані за релевантністю.
+    """
+    conn = await db.connection()
+    if conn.dialect.name == "sqlite":
+        match = fts5_query(q)
+        if not match:
+            return []
+        query = select(models.Contacts).from_statement(text(
+            "SELECT contacts.* FROM contacts_fts JOIN contacts ON contacts.id = contacts_fts.rowid "
+            "WHERE contacts_fts MATCH :match AND contacts.owner_id = :owner_id "
+            "ORDER BY bm25(contacts_fts), contacts.id LIMIT :limit"
+        ).bindparams(match=match, owner_id=user_id, limit=limit))
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    document = literal_column(models.SEARCH_TSVECTOR)
+    if len(q.strip()) < SEARCH_TRGM_MIN_LENGTH:
+        prefix = tsquery_prefix(q)
+        if not prefix:
+            return []
+        tsquery = func.to_tsquery(literal_column("'simple'::regconfig"), bindparam("prefix", prefix, type_=String))
+        query = (
+            select(models.Contacts)
+            .filter(models.Contacts.owner_id == user_id)
+            .filter(document.op("@@")(tsquery))
+            .order_by(func.ts_rank(document, tsquery).desc(), models.Contacts.id)
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    trigrams = literal_column(models.SEARCH_TRGM)
+    term = bindparam("q", q, type_=String)
+    pattern = bindparam("pattern", "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%", type_=String)
+    tsquery = func.websearch_to_tsquery(literal_column("'simple'::regconfig"), term)
+    rank = func.ts_rank(document, tsquery) + func.similarity(trigrams, term)
+    query = (
+        select(models.Contacts)
+        .filter(models.Contacts.owner_id == user_id)
+        .filter(or_(document.op("@@")(tsquery), trigrams.op("%")(term), trigrams.ilike(pattern)))
+        .order_by(rank.desc(), models.Contacts.id)
+        .limit(limit)
+    )
+    result = await db.execute(query)
+    return result.scalars().all()
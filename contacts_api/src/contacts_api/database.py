@@ -1,18 +1,190 @@
+import asyncio
 import os
+import threading
+import time
 
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from dotenv import load_dotenv
 load_dotenv()
 DATABASE_URL =os.getenv("DATABASE_URL")
 
+# async drivers for the sync URLs used by alembic and init_db
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+psycopg",
+    "postgresql+psycopg2": "postgresql+psycopg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_url(url: str) -> str:
+    """
+    Перетворює синхронний URL бази даних на URL з асинхронним драйвером.
+
+    Args:
+        url (str): URL бази даних, наприклад ``postgresql://...``.
+
+    Returns:
+        str: URL з драйвером ``psycopg`` (async) або ``aiosqlite``.
+    """
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or get_async_url(DATABASE_URL)
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", -1))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", 0))
+
+
+class PoolStats:
+    """
+    Лічильники очікування на з'єднання з пулу.
+
+    Час очікування рахується від запиту з'єднання до його отримання
+    (включно з відкриттям нового з'єднання, якщо пул його створює).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            if seconds > self.wait_max:
+                self.wait_max = seconds
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_total_ms": round(self.wait_total * 1000, 3),
+                "wait_avg_ms": round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+pool_stats = PoolStats()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул з'єднань, який вимірює час очікування на кожен checkout.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.record_timeout()
+            raise
+        pool_stats.record_wait(time.perf_counter() - started)
+        return entry
+
+
+def get_pool_options(url: str) -> dict:
+    """
+    Повертає налаштування пулу з'єднань для ``create_async_engine``.
+
+    Для SQLite в пам'яті SQLAlchemy використовує ``StaticPool``,
+    тому налаштування пулу не передаються.
+
+    Args:
+        url (str): URL бази даних.
+
+    Returns:
+        dict: Аргументи пулу для рушія.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **get_pool_options(ASYNC_DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
-def get_db():
-    db = SessionLocal()
-    try:
+
+
+async def get_db():
+    """
+    Залежність FastAPI, що видає асинхронну сесію бази даних на час запиту.
+
+    Yields:
+        AsyncSession: Сесія бази даних.
+    """
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
+
+
+def pool_status() -> dict:
+    """
+    Поточний стан пулу з'єднань асинхронного рушія.
+
+    Returns:
+        dict: Розмір пулу, зайняті/вільні з'єднання, overflow та лічильники очікування.
+    """
+    pool = async_engine.pool
+    status = {"pool": pool.__class__.__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            # QueuePool counts overflow from -pool_size until the pool is filled
+            "overflow": max(0, pool.overflow()),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "timeout": DB_POOL_TIMEOUT,
+        })
+    status.update(pool_stats.as_dict())
+    return status
+
+
+async def warm_up_pool(connections: int = DB_POOL_WARMUP):
+    """
+    Відкриває з'єднання наперед, щоб перші запити не платили за підключення.
+
+    Args:
+        connections (int): Кількість з'єднань, не більше розміру пулу.
+    """
+    connections = min(connections, DB_POOL_SIZE)
+    if connections <= 0:
+        return
+    conns = await asyncio.gather(*(async_engine.connect() for _ in range(connections)))
+    for conn in conns:
+        await conn.close()
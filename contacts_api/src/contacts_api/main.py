@@ -1,16 +1,38 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import contacts ,auth
-from .utils.limiter import limiter
+from fastapi.staticfiles import StaticFiles
+from .database import async_engine, warm_up_pool
+from .routers import contacts ,auth, avatars, internal, metrics
+from .utils.limiter import limiter, rate_limit_exceeded_handler
+from .utils.email_sender import smtp_pool
+from .utils.metrics import MetricsMiddleware, mark_process_dead
+from .utils.profiling import PROFILING, ProfilingMiddleware, install_query_listeners
+from .utils.slow_queries import SLOW_QUERY_THRESHOLD_MS, SlowQueryMiddleware, install_slow_query_log
+from .services.storage import avatar_storage, LocalStorage, MEDIA_ROOT, media_mount_path
+from .services.thumbnails import thumbnail_cache
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
-from slowapi import _rate_limit_exceeded_handler
 original =[
     "http://localhost:8000",
      "http://127.0.0.1:5500",
 ]
 
-app =FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warm_up_pool()
+    yield
+    await smtp_pool.close()
+    if slow_query_log is not None:
+        await slow_query_log.close()
+    thumbnail_cache.shutdown()
+    await async_engine.dispose()
+    mark_process_dead()
+
+
+app =FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,8 +42,26 @@ app.add_middleware(
     allow_headers =["*"],
 )
 
+app.add_middleware(MetricsMiddleware)
+
+slow_query_log = None
+if SLOW_QUERY_THRESHOLD_MS:
+    app.add_middleware(SlowQueryMiddleware)
+    slow_query_log = install_slow_query_log(async_engine)
+
+if PROFILING:
+    # added last, so it wraps everything else and times the whole request
+    app.add_middleware(ProfilingMiddleware)
+    install_query_listeners(async_engine.sync_engine)
+
 app.state.limiter =limiter
 
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 app.include_router(contacts.router)
 app.include_router(auth.router)
+app.include_router(avatars.router)
+app.include_router(internal.router)
+app.include_router(metrics.router)
+
+if isinstance(avatar_storage, LocalStorage):
+    app.mount(media_mount_path(), StaticFiles(directory=MEDIA_ROOT), name="media")
@@ -1,7 +1,8 @@
-from sqlalchemy import Column ,String ,Integer,Date,func ,ForeignKey,Boolean
+from sqlalchemy import Column ,String ,Integer,SmallInteger,Date,func ,ForeignKey,Boolean,Index,DDL,event,JSON
 from .database import Base
 from sqlalchemy.orm import  relationship
 from sqlalchemy.sql.sqltypes import DateTime
+from datetime import datetime
 class Contacts(Base):
     __tablename__  ='contacts'
 
@@ -11,11 +12,57 @@ class Contacts(Base):
     phone = Column(String,nullable=False)
     birthday = Column(Date , nullable=True)
     about = Column(String(250))
+    # birthday as month * 100 + day, so upcoming birthdays are an index range scan
+    birthday_md = Column(SmallInteger, nullable=True)
+    # bumped by every UPDATE in crud.py; the contact's ETag is "<id>-<version>"
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     owner_id =Column(Integer,ForeignKey("users.id"),nullable=False)
 
     owner = relationship("User",back_populates="contacts")
-    
+
+    __table_args__ = (
+        Index("ix_contacts_owner_id_id", "owner_id", "id"),
+        Index("ix_contacts_owner_id_name_id", "owner_id", "name", "id"),
+        Index("ix_contacts_owner_id_birthday_md", "owner_id", "birthday_md"),
+    )
+
+
+# search expressions; crud.search_contacts must use exactly the same SQL so the planner picks the indexes
+SEARCH_TSVECTOR = (
+    "to_tsvector('simple'::regconfig, coalesce(name, '') || ' ' || coalesce(email, '') "
+    "|| ' ' || coalesce(phone, '') || ' ' || coalesce(about, ''))"
+)
+SEARCH_TRGM = "(coalesce(name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(phone, ''))"
+
+SEARCH_DDL = {
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        # btree_gin lets owner_id lead the GIN indexes, so a search never scans other owners' rows
+        "CREATE EXTENSION IF NOT EXISTS btree_gin",
+        f"CREATE INDEX ix_contacts_search_tsv ON contacts USING gin (owner_id, {SEARCH_TSVECTOR})",
+        f"CREATE INDEX ix_contacts_search_trgm ON contacts USING gin (owner_id, {SEARCH_TRGM} gin_trgm_ops)",
+    ],
+    # external-content FTS5 table kept in sync with contacts by triggers
+    "sqlite": [
+        "CREATE VIRTUAL TABLE contacts_fts USING fts5("
+        "name, email, phone, about, content='contacts', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER contacts_fts_ai AFTER INSERT ON contacts BEGIN "
+        "INSERT INTO contacts_fts(rowid, name, email, phone, about) VALUES (new.id, new.name, new.email, new.phone, new.about); END",
+        "CREATE TRIGGER contacts_fts_ad AFTER DELETE ON contacts BEGIN "
+        "INSERT INTO contacts_fts(contacts_fts, rowid, name, email, phone, about) "
+        "VALUES ('delete', old.id, old.name, old.email, old.phone, old.about); END",
+        "CREATE TRIGGER contacts_fts_au AFTER UPDATE ON contacts BEGIN "
+        "INSERT INTO contacts_fts(contacts_fts, rowid, name, email, phone, about) "
+        "VALUES ('delete', old.id, old.name, old.email, old.phone, old.about); "
+        "INSERT INTO contacts_fts(rowid, name, email, phone, about) VALUES (new.id, new.name, new.email, new.phone, new.about); END",
+    ],
+}
+
+for dialect, statements in SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(Contacts.__table__, "after_create", DDL(statement).execute_if(dialect=dialect))
+
 
 
 class User(Base):
@@ -32,4 +79,23 @@ class User(Base):
     is_verified = Column(Boolean, default=False)
 
     contacts = relationship("Contacts", back_populates="owner")
-    
\ No newline at end of file
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True)
+    to_email = Column(String(250), nullable=False)
+    # kind selects the template used by workers/email_outbox.py
+    kind = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(String(500), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import EmailOutbox
+
+
+async def enqueue_email(to_email: str, kind: str, payload: dict, db: AsyncSession) -> EmailOutbox:
+    """
+    Додає лист до outbox у поточній транзакції (без commit).
+    """
+    message = EmailOutbox(to_email=to_email, kind=kind, payload=payload, next_attempt_at=datetime.utcnow())
+    db.add(message)
+    return message
+
+
+async def claim_batch(db: AsyncSession, limit: int, lease_seconds: float) -> list[EmailOutbox]:
+    """
+    Забирає пачку листів, готових до відправки.
+
+    На PostgreSQL рядки блокуються ``FOR UPDATE SKIP LOCKED``, тож кілька
+    воркерів не отримають той самий лист. Забраним листам ``next_attempt_at``
+    зсувається на ``lease_seconds``: якщо воркер впаде, лист повернеться в роботу.
+    """
+    now = datetime.utcnow()
+    result = await db.execute(
+        select(EmailOutbox)
+        .where(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    messages = result.scalars().all()
+    for message in messages:
+        message.attempts += 1
+        message.next_attempt_at = now + timedelta(seconds=lease_seconds)
+    await db.commit()
+    return messages
+
+
+async def mark_sent(ids: list[int], db: AsyncSession) -> None:
+    if ids:
+        await db.execute(
+            update(EmailOutbox).where(EmailOutbox.id.in_(ids)).values(status="sent", sent_at=datetime.utcnow(), last_error=None)
+        )
+    await db.commit()
+
+
+async def mark_failed(message: EmailOutbox, error: str, db: AsyncSession, backoff_seconds: float, max_attempts: int) -> None:
+    """
+    Планує повторну спробу з експоненційною затримкою або позначає лист як failed.
+    """
+    values = {"last_error": error[:500]}
+    if message.attempts >= max_attempts:
+        values["status"] = "failed"
+    else:
+        values["next_attempt_at"] = datetime.utcnow() + timedelta(seconds=backoff_seconds * 2 ** (message.attempts - 1))
+    await db.execute(update(EmailOutbox).where(EmailOutbox.id == message.id).values(**values))
+    await db.commit()
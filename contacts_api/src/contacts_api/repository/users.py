@@ -1,28 +1,53 @@
 from libgravatar import Gravatar
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import User
 from ..schemas import UserModel
+from ..services.user_cache import invalidate_user
 
 
-async def get_user_by_email(email: str, db: Session) -> User:
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_email(email: str, db: AsyncSession) -> User:
+    result = await db.execute(select(User).filter(User.email == email))
+    return result.scalars().first()
 
 
-async def create_user(body: UserModel, db: Session) -> User:
+async def get_avatar(user_id: int, db: AsyncSession) -> str | None:
+    result = await db.execute(select(User.avatar).where(User.id == user_id))
+    return result.scalar_one_or_none()
+
+
+async def create_user(body: UserModel, db: AsyncSession, commit: bool = True) -> User:
     avatar = None
     try:
         g = Gravatar(body.email)
         avatar = g.get_image()
     except Exception as e:
         print(e)
-    new_user = User(**body.dict(), avatar=avatar)
+    new_user = User(**body.model_dump(), avatar=avatar)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    if not commit:
+        # caller commits together with its own writes (e.g. the email outbox row)
+        await db.flush()
+        return new_user
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 
-async def update_token(user: User, token: str | None, db: Session) -> None:
+async def update_token(user: User, token: str | None, db: AsyncSession) -> None:
     user.refresh_token = token
-    db.commit()
+    await db.commit()
+    invalidate_user(user.email)
+
+
+async def confirm_email(user: User, db: AsyncSession) -> None:
+    user.is_verified = True
+    await db.commit()
+    invalidate_user(user.email)
+
+
+async def update_avatar(email: str, url: str | None, db: AsyncSession) -> None:
+    await db.execute(update(User).where(User.email == email).values(avatar=url))
+    await db.commit()
+    invalidate_user(email)
@@ -1,25 +1,27 @@
+import uuid
 from typing import List
 
-from fastapi import APIRouter, HTTPException,File, Depends, status, Security ,UploadFile
+from fastapi import APIRouter, HTTPException, Depends, status, Security, Request
 from fastapi.security import OAuth2PasswordRequestForm, HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
 from ..schemas import UserModel, UserResponse, TokenModel
 from ..repository import users as repository_users
+from ..repository import outbox as repository_outbox
 from ..services.auth import auth_service
 
-from fastapi import BackgroundTasks
 from ..services.auth import auth_service
-from ..utils.email_sender import send_verification_email
 from urllib.parse import urlencode
 
 from fastapi.responses import HTMLResponse
 from jinja2 import Environment, FileSystemLoader
 from pathlib import Path
 
-import cloudinary.uploader
-from ..services import cloudinary_config
+from ..services.storage import avatar_storage, AVATAR_MAX_BYTES, AVATAR_CONTENT_TYPES
+from ..services.thumbnails import avatar_key, thumbnail_cache, thumbnail_key
+from ..utils.uploads import receive_upload
+from .avatars import thumbnail_urls
 
 router = APIRouter(prefix='/auth', tags=["auth"])
 security = HTTPBearer()
@@ -29,13 +31,12 @@ env = Environment(loader=FileSystemLoader(str(BASE_DIR)), autoescape=True)
 
 
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def signup(body: UserModel, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def signup(body: UserModel, db: AsyncSession = Depends(get_db)):
     """ 
     Реэстрація користувача
     Argus: 
         body (ContactCreate): Дані нового контакту.
-        background_tasks (BackgroundTasks): Список фонових задач .
-        db (Session, optional): Поточний користувач.
+        db (AsyncSession, optional): Поточний користувач.
         
 
     Returns:
@@ -49,27 +50,29 @@ async def signup(body: UserModel, background_tasks: BackgroundTasks, db: Session
     exist_user = await repository_users.get_user_by_email(body.email, db)
     if exist_user:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Account already exists")
-    body.password = auth_service.get_password_hash(body.password)
-    new_user = await repository_users.create_user(body, db)
+    body.password = await auth_service.get_password_hash(body.password)
+    new_user = await repository_users.create_user(body, db, commit=False)
 
     
     token = await auth_service.create_email_token(data={"sub": new_user.email})
     
     verify_link = f"http://localhost:8000/auth/verify?token={token}"   # в прод — домен
 
-   
-    background_tasks.add_task(send_verification_email, new_user.email, verify_link)
+    # the email is sent by workers/email_outbox.py; user and outbox row commit together
+    await repository_outbox.enqueue_email(new_user.email, "email_verify", {"verify_link": verify_link}, db)
+    await db.commit()
+    await db.refresh(new_user)
 
     return {"user": new_user, "detail": "User successfully created. Check email for verification"}
 @router.post("/login", response_model=TokenModel)
-async def login(body: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(body: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
 
     """
     Вхід користувача (авторизація).
 
     Args:
         body (OAuth2PasswordRequestForm): Логін і пароль.
-        db (Session, optional): Сесія бази даних.
+        db (AsyncSession, optional): Сесія бази даних.
 
     Returns:
         dict: JWT токени (access і refresh).
@@ -80,23 +83,23 @@ async def login(body: OAuth2PasswordRequestForm = Depends(), db: Session = Depen
     user = await repository_users.get_user_by_email(body.username, db)
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email")
-    if not auth_service.verify_password(body.password, user.password):
+    if not await auth_service.verify_password(body.password, user.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password")
     # Generate JWT
-    access_token = await auth_service.create_access_token(data={"sub": user.email})
+    access_token = await auth_service.create_access_token(data={"sub": user.email, "uid": user.id})
     refresh_token = await auth_service.create_refresh_token(data={"sub": user.email})
     await repository_users.update_token(user, refresh_token, db)
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 
 @router.get('/refresh_token', response_model=TokenModel)
-async def refresh_token(credentials: HTTPAuthorizationCredentials = Security(security), db: Session = Depends(get_db)):
+async def refresh_token(credentials: HTTPAuthorizationCredentials = Security(security), db: AsyncSession = Depends(get_db)):
     """
     Оновлення токенів доступу.
 
     Args:
         credentials (HTTPAuthorizationCredentials): Токен авторизації.
-        db (Session, optional): Сесія бази даних.
+        db (AsyncSession, optional): Сесія бази даних.
 
     Returns:
         dict: Нові JWT токени.
@@ -111,19 +114,19 @@ async def refresh_token(credentials: HTTPAuthorizationCredentials = Security(sec
         await repository_users.update_token(user, None, db)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
 
-    access_token = await auth_service.create_access_token(data={"sub": email})
+    access_token = await auth_service.create_access_token(data={"sub": email, "uid": user.id})
     refresh_token = await auth_service.create_refresh_token(data={"sub": email})
     await repository_users.update_token(user, refresh_token, db)
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 @router.get("/verify", response_class=HTMLResponse)
-async def verify_email(token: str, db: Session = Depends(get_db)):
+async def verify_email(token: str, db: AsyncSession = Depends(get_db)):
     """
     Підтвердження email через токен.
 
     Args:
         token (str): Токен з email.
-        db (Session, optional): Сесія бази даних.
+        db (AsyncSession, optional): Сесія бази даних.
 
     Returns:
         HTMLResponse: HTML сторінка з результатом перевірки.
@@ -138,24 +141,20 @@ async def verify_email(token: str, db: Session = Depends(get_db)):
         return HTMLResponse(content="<h1>User not found</h1>", status_code=404)
 
     if not user.is_verified:
-        user.is_verified = True
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        await repository_users.confirm_email(user, db)
 
     template = env.get_template("email_verify.html")
     html_content = template.render(verify_link=f"http://localhost:8000")
     return HTMLResponse(content=html_content)
 
 @router.post("/resend-verify")
-async def resend_verification(body:dict,background_tasks:BackgroundTasks,db:Session =Depends(get_db)):
+async def resend_verification(body:dict,db: AsyncSession =Depends(get_db)):
     """
     Повторна відправка листа для підтвердження email.
 
     Args:
         body (dict): Словник з ключем "email".
-        background_tasks (BackgroundTasks): Список фонових задач.
-        db (Session, optional): Сесія бази даних.
+        db (AsyncSession, optional): Сесія бази даних.
 
     Returns:
         dict: Повідомлення про відправку листа.
@@ -171,40 +170,68 @@ async def resend_verification(body:dict,background_tasks:BackgroundTasks,db:Sess
         return{"detail": "Already verified"}
     token = await auth_service.create_email_token({'sub':user.email})
     verify_link = f"http://localhost:8000/api/auth/verify?token={token}"
-    background_tasks.add_task(send_verification_email,user.email , verify_link )
+    await repository_outbox.enqueue_email(user.email, "email_verify", {"verify_link": verify_link}, db)
+    await db.commit()
     return {"detail": "Verification email sent"}
 
-@router.post("/avatar")
+AVATAR_UPLOAD_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "properties": {"file": {"type": "string", "format": "binary"}},
+            "required": ["file"],
+        }}},
+    }
+}
+
+
+@router.post("/avatar", openapi_extra=AVATAR_UPLOAD_SCHEMA)
 async def update_avatar(
-    file: UploadFile =File(...),
+    request: Request,
     current_user =Depends(auth_service.get_current_user),
-    db: Session =Depends(get_db)
+    db: AsyncSession =Depends(get_db)
 ):
     """
     Оновлення аватара користувача.
 
+    Файл читається потоком у тимчасовий файл (з перевіркою розміру і типу),
+    з нього в пулі процесів генеруються мініатюри, а потім файл передається
+    у сховище ``avatar_storage``; з'єднання з базою під час завантаження
+    не утримується.
+
     Args:
-        file (UploadFile): Завантажений файл зображення.
-        current_user (User): Поточний користувач.
-        db (Session, optional): Сесія бази даних.
+        request (Request): Запит із файлом у полі ``file`` (multipart/form-data).
+        current_user (CurrentUser): Поточний користувач.
+        db (AsyncSession, optional): Сесія бази даних.
 
     Returns:
-        dict: URL нового аватара.
+        dict: URL нового аватара і версіоновані URL мініатюр.
 
     Raises:
-        HTTPException: 400, якщо виникла помилка при завантаженні.
+        HTTPException: 413, якщо файл завеликий; 415, якщо це не зображення;
+            502, якщо сховище не прийняло файл.
     """
+    # the session may hold a connection since the user lookup; release it for the upload
+    await db.close()
+    upload = await receive_upload(request, "file", AVATAR_MAX_BYTES, AVATAR_CONTENT_TYPES)
+    upload_key = f"upload{uuid.uuid4().hex}"
     try:
-        result = cloudinary_config.cloudinary.uploader.upload(
-            file.file,
-            folder ="avatars"
-        )
-        avatar_url = result.get("secure_url")
-        current_user.avatar =avatar_url
-        db.add(current_user)
-        db.commit()
-        db.refresh(current_user)
-
-        return {"avatar_url":avatar_url}
-    except Exception  as e:
-        raise HTTPException(status_code=400,detail =str(e))
\ No newline at end of file
+        try:
+            await thumbnail_cache.generate(upload.path, upload_key)
+        except Exception:
+            # a decode error may come after some sizes were written
+            thumbnail_cache.remove(upload_key)
+            raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Image cannot be decoded")
+        try:
+            avatar_url = await avatar_storage.save(upload.path, current_user.id, upload.content_type)
+        except Exception as e:
+            thumbnail_cache.remove(upload_key)
+            raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Avatar storage error: {e}")
+    finally:
+        upload.remove()
+
+    key = avatar_key(avatar_url)
+    thumbnail_cache.rename(upload_key, thumbnail_key(current_user.id, key))
+    await repository_users.update_avatar(current_user.email, avatar_url, db)
+    return {"avatar_url":avatar_url, "thumbnails": thumbnail_urls(current_user.id, key)}
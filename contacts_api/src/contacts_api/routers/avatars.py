@@ -0,0 +1,111 @@
+import os
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse, RedirectResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db
+from ..repository import users as repository_users
+from ..services.storage import local_path
+from ..services.thumbnails import AVATAR_SIZES, avatar_key, nearest_size, thumbnail_cache, thumbnail_key
+
+# max-age for unversioned avatar URLs; versioned ones (?v=) never change
+AVATAR_MAX_AGE = int(os.getenv("AVATAR_MAX_AGE", 3600))
+IMMUTABLE = "public, max-age=31536000, immutable"
+# the form of avatar_key(): 16 hex digits
+AVATAR_VERSION_PATTERN = "^[0-9a-f]{16}$"
+
+router = APIRouter(prefix='/avatars', tags=["avatars"])
+
+
+def avatar_url(user_id: int, key: str, size: int) -> str:
+    return f"/avatars/{user_id}?s={size}&v={key}"
+
+
+def thumbnail_urls(user_id: int, key: str) -> dict:
+    """
+    Версіоновані URL мініатюр усіх розмірів.
+    """
+    return {size: avatar_url(user_id, key, size) for size in AVATAR_SIZES}
+
+
+def resized_url(url: str, size: int) -> str | None:
+    """
+    URL зовнішнього аватара потрібного розміру (Gravatar ``s=``, трансформація Cloudinary).
+    """
+    parts = urlsplit(url)
+    if parts.netloc.endswith("gravatar.com"):
+        query = dict(parse_qsl(parts.query))
+        query["s"] = str(size)
+        return urlunsplit(parts._replace(query=urlencode(query)))
+    if parts.netloc == "res.cloudinary.com" and "/image/upload/" in parts.path:
+        path = parts.path.replace("/image/upload/", f"/image/upload/c_fill,w_{size},h_{size},f_auto/", 1)
+        return urlunsplit(parts._replace(path=path))
+    return None
+
+
+def thumbnail_response(request: Request, key: str, size: int, cache_control: str) -> Response | None:
+    path = thumbnail_cache.get(key, size)
+    if path is None:
+        return None
+    headers = {"Cache-Control": cache_control, "ETag": f'"{key}-{size}"'}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FileResponse(path, media_type="image/webp", headers=headers)
+
+
+@router.get("/{user_id}")
+async def read_avatar(
+    user_id: int,
+    request: Request,
+    s: int = Query(default=64, ge=1, le=2048),
+    v: str | None = Query(default=None, pattern=AVATAR_VERSION_PATTERN),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Аватар користувача потрібного розміру.
+
+    Мініатюри завантажених аватарів віддаються з дискового кешу; з ``v``
+    (ключ версії з відповіді ``/auth/avatar``) відповідь кешується клієнтом
+    назавжди і не потребує запиту до бази. Gravatar і Cloudinary
+    перенаправляються на URL із потрібним розміром.
+
+    Args:
+        user_id (int): ID користувача.
+        request (Request): HTTP-запит.
+        s (int): Бажаний розмір у пікселях; округлюється до найближчого згенерованого.
+        v (str, optional): Версія аватара.
+        db (AsyncSession, optional): Сесія бази даних.
+
+    Returns:
+        Response: WebP-мініатюра, 304 або перенаправлення.
+
+    Raises:
+        HTTPException: 404, якщо аватара немає.
+    """
+    size = nearest_size(s)
+    if v:
+        # the cache key includes user_id, so a version only resolves under its owner's URL
+        response = thumbnail_response(request, thumbnail_key(user_id, v), size, IMMUTABLE)
+        if response is not None:
+            return response
+
+    url = await repository_users.get_avatar(user_id, db)
+    if not url:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Avatar not found")
+
+    version = avatar_key(url)
+    key = thumbnail_key(user_id, version)
+    cache_control = IMMUTABLE if v == version else f"public, max-age={AVATAR_MAX_AGE}"
+    response = thumbnail_response(request, key, size, cache_control)
+    if response is not None:
+        return response
+
+    # evicted or never generated: rebuild from the local original if there is one
+    source = local_path(url)
+    if source is not None and source.is_file():
+        await thumbnail_cache.generate(source, key)
+        return thumbnail_response(request, key, size, cache_control)
+
+    return RedirectResponse(resized_url(url, size) or url, headers={"Cache-Control": f"public, max-age={AVATAR_MAX_AGE}"})
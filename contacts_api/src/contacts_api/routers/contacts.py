@@ -1,103 +1,442 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import os
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from .. import crud
 from ..schemas import ContactCreate, Contact 
-from ..database import get_db 
+from ..database import AsyncSessionLocal, get_db
 from .. import models, schemas
 from fastapi import HTTPException
 import asyncio
 from ..services.auth import auth_service
 from ..utils.limiter import limiter
+from ..utils.etag import contact_etag, if_match_versions, list_etag
+from ..utils.response_cache import CachedResponse, response_cache
+from ..utils.serialization import FAST_SERIALIZATION, contact_dict, contact_page_json
+from ..utils.contact_io import EXPORT_COLUMNS, EXPORT_MEDIA_TYPES, IMPORT_FORMATS, iter_contact_batches, iter_export_chunks
 from fastapi import Request
 router = APIRouter(prefix='/contacts', tags=['contacts'])
 
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 1000))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", 1000))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+
+async def raise_write_failed(db: AsyncSession, contact_id: int, owner_id: int, versions: list[int] | None):
+    """
+    Пояснює, чому запис не застосувався: 404, якщо контакту немає,
+    або 412, якщо він є, але його версія не відповідає ``If-Match``.
+    """
+    if versions is not None and await crud.get_contact_version(db, contact_id, owner_id) is not None:
+        raise HTTPException(status_code=412, detail="Contact was modified (If-Match does not match)")
+    raise HTTPException(status_code=404, detail="Contact not found or not authorized")
+
 
 @router.post('/', response_model=Contact)
 @limiter.limit("5/minute")  
 async def create_contact(
     request: Request,
+    response: Response,
     body: ContactCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth_service.get_current_user)  
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.CurrentUser = Depends(auth_service.get_current_user)  
 ):  
     """
     Створює контакт у базі даних з обмеженням по кількості запитів.
 
     Args:
         request (Request): HTTP-запит.
+        response (Response): Відповідь (для заголовка ETag).
         body (ContactCreate): Дані нового контакту.
-        db (Session, optional): Сесія бази даних.
-        current_user (models.User, optional): Поточний користувач.
+        db (AsyncSession, optional): Сесія бази даних.
+        current_user (CurrentUser, optional): Поточний користувач.
 
     Returns:
         Contact: Створений контакт.
     """
-    return crud.create_contact(body, db, current_user)
+    contact = await crud.create_contact(body, db, current_user)
+    response.headers["ETag"] = contact_etag(contact)
+    return contact
+
+@router.post("/import", response_model=schemas.ContactImportResult)
+@limiter.limit("2/minute")
+async def import_contacts(
+    request: Request,
+    format: Literal["csv", "ndjson"] | None = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.CurrentUser = Depends(auth_service.get_current_user)
+):
+    """
+    Імпортує контакти з CSV або NDJSON, переданих у тілі запиту.
+
+    Тіло читається потоком; записи перевіряються і вставляються пачками
+    по ``IMPORT_BATCH_SIZE``, кожна пачка — окрема транзакція.
+
+    Args:
+        request (Request): HTTP-запит із файлом у тілі.
+        format (str, optional): ``csv`` або ``ndjson``; за замовчуванням визначається з Content-Type.
+        db (AsyncSession, optional): Сесія бази даних.
+        current_user (CurrentUser, optional): Поточний користувач.
+
+    Returns:
+        ContactImportResult: Кількість імпортованих записів і помилки по рядках.
+
+    Raises:
+        HTTPException 415: якщо формат не вказано і Content-Type не підтримується.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    fmt = format or IMPORT_FORMATS.get(content_type)
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Use text/csv or application/x-ndjson")
+
+    imported, failed, errors = 0, 0, []
+    async for batch, batch_errors in iter_contact_batches(request.stream(), fmt, IMPORT_BATCH_SIZE):
+        try:
+            imported += await crud.bulk_create_contacts(db, [body for _, body in batch], current_user.id)
+        except Exception as e:
+            await db.rollback()
+            batch_errors += [{"row": row, "errors": [f"Database error: {e.__class__.__name__}"]} for row, _ in batch]
+        failed += len(batch_errors)
+        errors += batch_errors[:IMPORT_MAX_ERRORS - len(errors)]
+    return {"imported": imported, "failed": failed, "errors": errors, "errors_truncated": failed > len(errors)}
+
+@router.get("/export")
+async def export_contacts(
+    format: Literal["csv", "ndjson"] = "ndjson",
+    current_user: schemas.CurrentUser = Depends(auth_service.get_current_user)
+):
+    """
+    Експортує всі контакти поточного користувача потоком.
+
+    Рядки читаються серверним курсором пачками по ``EXPORT_BATCH_SIZE``,
+    тож пам'ять не залежить від розміру адресної книги.
+
+    Args:
+        format (str): ``ndjson`` або ``csv``.
+        current_user (CurrentUser, optional): Поточний користувач.
+
+    Returns:
+        StreamingResponse: Файл з контактами.
+    """
+    owner_id = current_user.id
+
+    async def body():
+        # the request-scoped session is closed before the response is streamed
+        async with AsyncSessionLocal() as db:
+            partitions = crud.stream_contacts_by_user(db, owner_id, EXPORT_COLUMNS, EXPORT_BATCH_SIZE)
+            async for chunk in iter_export_chunks(partitions, format):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="contacts.{format}"'},
+    )
+
+@router.get("/birthdays", response_model=list[schemas.Contact])
+async def upcoming_birthdays(
+    days: int = Query(7, ge=1, le=366),
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.CurrentUser = Depends(auth_service.get_current_user)
+):
+    """
+    Контакти поточного користувача з днем народження в найближчі дні.
+
+    Args:
+        days (int): Кількість днів наперед, включно з сьогоднішнім.
+        db (AsyncSession, optional): Сесія бази даних.
+        current_user (CurrentUser, optional): Поточний користувач.
+
+    Returns:
+        list[Contact]: Контакти, відсортовані за найближчим днем народження.
+    """
+    return await crud.get_upcoming_birthdays(db, current_user.id, days)
+
+@router.get("/search", response_model=list[schemas.Contact])
+async def search_contacts(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.CurrentUser = Depends(auth_service.get_current_user)
+):
+    """
+    Шукає контакти поточного користувача за ім'ям, email, телефоном та описом.
+
+    Args:
+        q (str): Пошуковий рядок.
+        limit (int): Максимальна кількість результатів.
+        db (AsyncSession, optional): Сесія бази даних.
+        current_user (CurrentUser, optional): Поточний користувач.
+
+    Returns:
+        list[Contact]: Знайдені контакти, найрелевантніші першими.
+    """
+    return await crud.search_contacts(db, current_user.id, q, limit)
+
+@router.get("/", response_model=schemas.ContactPage)
+async def list_contacts(
+    request: Request,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = None,
+    order_by: Literal["id", "name"] = "id",
+    skip: int | None = Query(None, ge=0, description="Legacy offset mode; prefer cursor"),
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.CurrentUser = Depends(auth_service.get_current_user)
+):
+    """
+    Повертає сторінку контактів поточного користувача.
+
+    Готова сторінка кешується в пам'яті до наступного запису цього
+    користувача; однакові одночасні промахи виконують один запит до бази.
+    З ``FAST_SERIALIZATION`` сторінка вибирається як рядки й серіалізується orjson.
+    Сторінка має ETag; якщо ``If-None-Match`` збігається, повертається 304
+    без серіалізації сторінки (і на промаху кешу).
+
+    Args:
+        request (Request): HTTP-запит.
+        limit (int): Розмір сторінки.
+        cursor (str, optional): ``next_cursor`` з попередньої сторінки.
+        order_by (str): Сортування: ``id`` або ``name``.
+        skip (int, optional): Застарілий режим з offset, курсор у ньому не повертається.
+        db (AsyncSession, optional): Сесія бази даних.
+        current_user (CurrentUser, optional): Поточний користувач.
+
+    Returns:
+        ContactPage: Контакти та курсор наступної сторінки (або 304).
+
+    Raises:
+        HTTPException 400: якщо курсор недійсний.
+    """
+    async def load():
+        if skip is not None:
+            items = await crud.get_contacts_by_user(db, current_user.id, skip=skip, limit=limit, as_rows=FAST_SERIALIZATION)
+            next_cursor = None
+        else:
+            items, next_cursor = await crud.get_contacts_page(
+                db, current_user.id, limit=limit, cursor=cursor, order_by=order_by, as_rows=FAST_SERIALIZATION
+            )
+
+        def render():
+            if FAST_SERIALIZATION:
+                return contact_page_json(items, next_cursor)
+            page = schemas.ContactPage.model_validate({"items": items, "next_cursor": next_cursor}, from_attributes=True)
+            return page.model_dump_json().encode()
+
+        # the ETag is known from ids and versions alone; the body is only serialized when it is sent
+        return CachedResponse(list_etag(items, next_cursor), render)
+
+    try:
+        cached = await response_cache.get_or_load(current_user.id, ("list", limit, cursor, order_by, skip), load)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return cached.response(request)
+
+@router.post("/batch/get", response_model=schemas.ContactBatchResult)
+async def batch_read_contacts(
+    body: schemas.ContactIds,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.CurrentUser = Depends(auth_service.get_current_user)
+):
+    """
+    Повертає багато контактів за списком ID одним запитом до бази.
+
+    З ``FAST_SERIALIZATION`` рядки серіалізуються orjson без повторної
+    перевірки через ``response_model``.
+
+    Args:
+        body (ContactIds): ID контактів (до 1000).
+        db (AsyncSession, optional): сесія бази даних
+        current_user (CurrentUser, optional): поточний користувач
+    Returns:
+        ContactBatchResult: Результат для кожного ID у порядку запиту (found або not_found).
+    """
+    contacts = await crud.get_contacts_by_ids(db, body.ids, current_user.id, as_rows=FAST_SERIALIZATION)
+    if FAST_SERIALIZATION:
+        return ORJSONResponse({"items": [
+            {"id": contact_id, "status": "found", "contact": contact_dict(contacts[contact_id])} if contact_id in contacts
+            else {"id": contact_id, "status": "not_found", "contact": None}
+            for contact_id in body.ids
+        ]})
+    return {"items": [
+        {"id": contact_id, "status": "found", "contact": contacts[contact_id]} if contact_id in contacts
+        else {"id": contact_id, "status": "not_found"}
+        for contact_id in body.ids
+    ]}
+
+@router.post("/batch/update", response_model=schemas.ContactBatchResult)
+async def batch_update_contacts(
+    body: schemas.ContactBatchUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.CurrentUser = Depends(auth_service.get_current_user)
+):
+    """
+    Частково оновлює багато контактів в одній транзакції.
+
+    Кожен елемент — ``id`` і поля, які потрібно змінити (як у PATCH).
+
+    Args:
+        body (ContactBatchUpdate): Зміни контактів (до 1000, ID не повторюються).
+        db (AsyncSession, optional): сесія бази даних
+        current_user (CurrentUser, optional): поточний користувач
+    Returns:
+        ContactBatchResult: updated, unchanged або not_found для кожного елемента.
+    """
+    changes = {item.id: item.model_dump(exclude_unset=True, exclude={"id"}) for item in body.items}
+    results = await crud.bulk_update_contacts(db, changes, current_user.id)
+    return {"items": [
+        {"id": contact_id, "status": status, "contact": contact}
+        for contact_id, (status, contact) in results.items()
+    ]}
+
+@router.post("/batch/delete", response_model=schemas.ContactBatchResult)
+async def batch_delete_contacts(
+    body: schemas.ContactIds,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.CurrentUser = Depends(auth_service.get_current_user)
+):
+    """
+    Видаляє багато контактів одним запитом.
+
+    Args:
+        body (ContactIds): ID контактів (до 1000).
+        db (AsyncSession, optional): сесія бази даних
+        current_user (CurrentUser, optional): поточний користувач
+    Returns:
+        ContactBatchResult: deleted або not_found для кожного ID.
+    """
+    deleted = {contact.id: contact for contact in await crud.bulk_delete_contacts(db, body.ids, current_user.id)}
+    return {"items": [
+        {"id": contact_id, "status": "deleted", "contact": deleted[contact_id]} if contact_id in deleted
+        else {"id": contact_id, "status": "not_found"}
+        for contact_id in body.ids
+    ]}
 
 @router.get("/{contact_id}", response_model=schemas.Contact)
-def read_contact(contact_id: int, db: Session = Depends(get_db)):
+async def read_contact(
+    contact_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.CurrentUser = Depends(auth_service.get_current_user)
+):
     """
-    Отримує контакт за його ID.
+    Отримує контакт поточного користувача за його ID.
+
+    Відповідь кешується так само, як і список контактів.
 
     Args:
         contact_id (int): ID контакту.
-        db (Session, optional): Сесія бази даних.
+        request (Request): HTTP-запит.
+        db (AsyncSession, optional): Сесія бази даних.
+        current_user (CurrentUser, optional): Поточний користувач.
 
     Returns:
-        Contact: Знайдений контакт.
+        Contact: Знайдений контакт або 304, якщо ``If-None-Match`` збігається з ETag.
 
     Raises:
         HTTPException: 404, якщо контакт не знайдено.
     """
-    contact = crud.get_contact(db, contact_id)  
-    if not contact:
+    async def load():
+        contact = await crud.get_contact(db, contact_id, current_user.id)
+        if contact is None:
+            return None
+        item = schemas.Contact.model_validate(contact)
+        return CachedResponse(contact_etag(contact), lambda: item.model_dump_json().encode())
+
+    cached = await response_cache.get_or_load(current_user.id, ("contact", contact_id), load)
+    if cached is None:
         raise HTTPException(status_code=404, detail="Contact not found")
-    return contact
+    return cached.response(request)
 
 @router.put("/{contact_id}", response_model=schemas.Contact)
-def update_contact(
+async def update_contact(
     contact_id: int,
     contact: ContactCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth_service.get_current_user)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.CurrentUser = Depends(auth_service.get_current_user)
 ):
     """
     Оновлює створиного контата в базі даних.
     Args:
         contact_id (int): id контакту
         contact (ContactCreate): контакт
-        db (Session, optional): сесія бази даних
-        current_user (models.User, optional): поточний користувач
+        request (Request): HTTP-запит (``If-Match`` з ETag контакту)
+        response (Response): відповідь (для нового ETag)
+        db (AsyncSession, optional): сесія бази даних
+        current_user (CurrentUser, optional): поточний користувач
     Returns:
         Contact: Оновлений контакт
     Raises:
         HTTPException 404: якщо контакт не знайдено
+        HTTPException 412: якщо контакт змінився після ETag з ``If-Match``
     """
-    db_contact = crud.get_contact(db, contact_id)
-    if not db_contact or db_contact.owner_id != current_user.id:
-        raise HTTPException(status_code=404, detail="Contact not found or not authorized")
-    return crud.update_contact(db, contact_id, contact)
+    versions = if_match_versions(request, contact_id)
+    db_contact = await crud.update_contact(db, contact_id, contact, current_user.id, versions)
+    if db_contact is None:
+        await raise_write_failed(db, contact_id, current_user.id, versions)
+    response.headers["ETag"] = contact_etag(db_contact)
+    return db_contact
+
+@router.patch("/{contact_id}", response_model=schemas.Contact)
+async def patch_contact(
+    contact_id: int,
+    contact: schemas.ContactUpdate,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.CurrentUser = Depends(auth_service.get_current_user)
+):
+    """
+    Частково оновлює контакт: записуються лише передані поля, що відрізняються
+    від збережених; якщо змін немає, запису в базу не відбувається.
+
+    Args:
+        contact_id (int): id контакту
+        contact (ContactUpdate): поля, які потрібно змінити
+        request (Request): HTTP-запит (``If-Match`` з ETag контакту)
+        response (Response): відповідь (для нового ETag)
+        db (AsyncSession, optional): сесія бази даних
+        current_user (CurrentUser, optional): поточний користувач
+    Returns:
+        Contact: Контакт після змін
+    Raises:
+        HTTPException 404: якщо контакт не знайдено
+        HTTPException 412: якщо контакт змінився після ETag з ``If-Match``
+    """
+    versions = if_match_versions(request, contact_id)
+    db_contact = await crud.patch_contact(db, contact_id, contact.model_dump(exclude_unset=True), current_user.id, versions)
+    if db_contact is None:
+        await raise_write_failed(db, contact_id, current_user.id, versions)
+    response.headers["ETag"] = contact_etag(db_contact)
+    return db_contact
 
 @router.delete("/{contact_id}", response_model=schemas.Contact)
-def delete_contact(    
+async def delete_contact(    
     contact_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth_service.get_current_user)
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.CurrentUser = Depends(auth_service.get_current_user)
 ):
     """
     Видаляє створиного контакту.
 
     Args:
         body (ContactCreate): дані нового контакту
-        db (Session, optional): сесія бази даних
-        current_user (models.User, optional): поточний користувач
+        request (Request): HTTP-запит (``If-Match`` з ETag контакту)
+        db (AsyncSession, optional): сесія бази даних
+        current_user (CurrentUser, optional): поточний користувач
 
     Returns:
     - Contact: видалає контакт
     Raises:
         HTTPException 404: якщо контакт не знайдено
+        HTTPException 412: якщо контакт змінився після ETag з ``If-Match``
     """
-    db_contact = crud.get_contact(db, contact_id)
-    if not db_contact or db_contact.owner_id != current_user.id:
-        raise HTTPException(status_code=404, detail="Contact not found or not authorized")
-    return crud.delete_contact(db, contact_id)
\ No newline at end of file
+    versions = if_match_versions(request, contact_id)
+    db_contact = await crud.delete_contact(db, contact_id, current_user.id, versions)
+    if db_contact is None:
+        await raise_write_failed(db, contact_id, current_user.id, versions)
+    return db_contact
\ No newline at end of file
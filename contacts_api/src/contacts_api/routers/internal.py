@@ -0,0 +1,54 @@
+import os
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from ..database import pool_status
+from ..utils.cache import caches
+
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
+# without a token the internal endpoints (and /metrics) are closed unless explicitly opened, e.g. for local runs
+INTERNAL_API_OPEN = os.getenv("INTERNAL_API_OPEN", "false").lower() in ("1", "true", "yes")
+
+router = APIRouter(prefix='/internal', tags=["internal"], include_in_schema=False)
+
+
+def check_internal_token(x_internal_token: str | None = Header(default=None)):
+    """
+    Перевіряє службовий токен з ``INTERNAL_API_TOKEN``.
+
+    Якщо токен не заданий, доступ закритий, доки не ввімкнено ``INTERNAL_API_OPEN``.
+
+    Raises:
+        HTTPException: 403, якщо токен не збігається або не налаштований.
+    """
+    if INTERNAL_API_TOKEN:
+        allowed = x_internal_token is not None and secrets.compare_digest(
+            x_internal_token.encode(), INTERNAL_API_TOKEN.encode()
+        )
+    else:
+        allowed = INTERNAL_API_OPEN
+    if not allowed:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+
+@router.get("/pool", dependencies=[Depends(check_internal_token)])
+async def read_pool_status():
+    """
+    Статистика пулу з'єднань з базою даних для поточного воркера.
+
+    Returns:
+        dict: Зайняті/вільні з'єднання, overflow та час очікування на з'єднання.
+    """
+    return {"pid": os.getpid(), **pool_status()}
+
+
+@router.get("/cache", dependencies=[Depends(check_internal_token)])
+async def read_cache_stats():
+    """
+    Статистика кешів поточного воркера.
+
+    Returns:
+        dict: Розмір і лічильники влучань/промахів кожного кешу.
+    """
+    return {"pid": os.getpid(), "caches": [cache.stats() for cache in caches.values()]}
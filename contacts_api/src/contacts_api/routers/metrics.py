@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, Response
+
+from ..utils.metrics import CONTENT_TYPE, render_metrics
+from .internal import check_internal_token
+
+router = APIRouter(tags=["internal"], include_in_schema=False)
+
+
+@router.get("/metrics", dependencies=[Depends(check_internal_token)])
+async def read_metrics():
+    """
+    Метрики у форматі Prometheus.
+
+    З ``PROMETHEUS_MULTIPROC_DIR`` відповідь охоплює всі воркери сервера,
+    інакше — лише поточний процес.
+
+    Returns:
+        Response: Текстовий формат експозиції Prometheus.
+    """
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel ,Field ,EmailStr
+from pydantic import BaseModel ,Field ,EmailStr, field_validator
 from datetime import date ,datetime
-from typing import Optional
+from typing import List, Literal, Optional
 
 
 class ContactBase(BaseModel):
@@ -15,6 +15,43 @@ class ContactCreate(ContactBase):
     pass
 
 
+class ContactUpdate(BaseModel):
+    """
+    Часткове оновлення контакту: змінюються лише передані поля.
+    """
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    birthday: Optional[date] = None
+    about: Optional[str] = None
+
+    @field_validator("name", "email", "phone")
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("field cannot be null")
+        return value
+
+
+class ContactIds(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=1000)
+
+
+class ContactBatchUpdateItem(ContactUpdate):
+    id: int
+
+
+class ContactBatchUpdate(BaseModel):
+    items: List[ContactBatchUpdateItem] = Field(min_length=1, max_length=1000)
+
+    @field_validator("items")
+    @classmethod
+    def unique_ids(cls, items):
+        if len({item.id for item in items}) != len(items):
+            raise ValueError("contact ids must be unique")
+        return items
+
+
 class Contact(ContactBase):
     id: int
 
@@ -22,6 +59,28 @@ class Contact(ContactBase):
         "from_attributes": True
     }
 
+class ContactPage(BaseModel):
+    items: List[Contact]
+    next_cursor: Optional[str] = None
+
+class ContactBatchItem(BaseModel):
+    id: int
+    status: Literal["found", "not_found", "updated", "unchanged", "deleted"]
+    contact: Optional[Contact] = None
+
+class ContactBatchResult(BaseModel):
+    items: List[ContactBatchItem]
+
+class ContactImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+class ContactImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ContactImportError]
+    errors_truncated: bool = False
+
 class UserModel(BaseModel):
     username: str = Field(min_length=5, max_length=16)
     email: EmailStr
@@ -39,6 +98,19 @@ class UserDb(BaseModel):
         orm_mode = True
 
 
+class CurrentUser(BaseModel):
+    id: int
+    email: str
+    username: str
+    is_verified: bool = False
+    avatar: Optional[str] = None
+
+    model_config = {
+        "from_attributes": True,
+        "frozen": True,
+    }
+
+
 class UserResponse(BaseModel):
     user: UserDb
     detail: str = "User successfully created"
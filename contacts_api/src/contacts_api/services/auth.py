@@ -1,3 +1,8 @@
+import asyncio
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from jose import JWTError, jwt
@@ -5,10 +10,26 @@ from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
 from ..repository import users as repository_users
+from ..schemas import CurrentUser
+from .user_cache import user_cache
+from ..utils.cache import TTLCache
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", 300))
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", os.cpu_count() or 1))
+HASH_MAX_QUEUE = int(os.getenv("HASH_MAX_QUEUE", 64))
+
+# bcrypt releases the GIL, so hashing scales with HASH_WORKERS threads without blocking the event loop
+hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+
+# verified payloads keyed by sha256 of the token; an entry never outlives the token's exp
+token_cache = TTLCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL, name="token")
 
 
 class Auth:
@@ -16,12 +37,38 @@ class Auth:
     Клас для роботи з автентифікацією користувачів:
     хешування паролів, створення та перевірка JWT токенів.
     """
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
     SECRET_KEY = "secret_key"
     ALGORITHM = "HS256"
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-    def verify_password(self, plain_password, hashed_password):
+    def __init__(self):
+        # bcrypt calls running or queued in hash_executor
+        self.hash_pending = 0
+
+    async def run_hashing(self, func, *args):
+        """
+        Виконує bcrypt у пулі потоків ``hash_executor``.
+
+        Одночасно виконується не більше ``HASH_WORKERS`` операцій, ще
+        ``HASH_MAX_QUEUE`` чекають у черзі; решта запитів відхиляється.
+
+        Викидає:
+        - HTTPException 503: якщо черга хешування переповнена.
+        """
+        if self.hash_pending >= HASH_WORKERS + HASH_MAX_QUEUE:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, try again later",
+                headers={"Retry-After": "1"},
+            )
+        self.hash_pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(hash_executor, func, *args)
+        finally:
+            self.hash_pending -= 1
+
+    async def verify_password(self, plain_password, hashed_password):
         """
         Перевіряє, чи введений пароль збігається з хешованим.
 
@@ -32,11 +79,11 @@ class Auth:
         Повертає:
         - bool: True, якщо паролі збігаються, інакше False.
         """
-        return self.pwd_context.verify(plain_password, hashed_password)
+        return await self.run_hashing(self.pwd_context.verify, plain_password, hashed_password)
 
-    def get_password_hash(self, password: str):
+    async def get_password_hash(self, password: str):
         """
-        Хешує пароль користувача.
+        Хешує пароль користувача з кількістю раундів ``BCRYPT_ROUNDS``.
 
         Параметри:
         - password (str): Звичайний пароль.
@@ -44,7 +91,32 @@ class Auth:
         Повертає:
         - str: Хешований пароль.
         """
-        return self.pwd_context.hash(password)
+        return await self.run_hashing(self.pwd_context.hash, password)
+
+    def decode_token(self, token: str) -> dict:
+        """
+        Декодує JWT і перевіряє підпис, використовуючи кеш перевірених токенів.
+
+        Запис у кеші живе не довше, ніж до ``exp`` токена, тому прострочений
+        токен після виходу з кешу знову перевіряється ``jwt.decode`` і відхиляється.
+
+        Параметри:
+        - token (str): JWT токен.
+
+        Повертає:
+        - dict: Payload токена.
+
+        Викидає:
+        - JWTError: якщо токен недійсний або прострочений.
+        """
+        key = hashlib.sha256(token.encode()).digest()
+        payload = token_cache.get(key)
+        if payload is None:
+            payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+            ttl = min(payload.get("exp", 0) - time.time(), TOKEN_CACHE_TTL)
+            if ttl > 0:
+                token_cache.set(key, payload, ttl)
+        return payload
 
     # define a function to generate a new access token
     async def create_access_token(self, data: dict, expires_delta: Optional[float] = None):
@@ -104,7 +176,7 @@ class Auth:
         - HTTPException 401: якщо токен недійсний або scope неправильний.
         """
         try:
-            payload = jwt.decode(refresh_token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+            payload = self.decode_token(refresh_token)
             if payload['scope'] == 'refresh_token':
                 email = payload['sub']
                 return email
@@ -112,16 +184,19 @@ class Auth:
         except JWTError:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate credentials')
 
-    async def get_current_user(self, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    async def get_current_user(self, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
         """
         Отримує поточного користувача з JWT access-токена.
 
+        Підтверджений користувач кешується за email з токена (див. ``user_cache``),
+        тож повторні запити не звертаються до таблиці users.
+
         Параметри:
         - token (str): JWT access-токен.
-        - db (Session): Сесія бази даних.
+        - db (AsyncSession): Сесія бази даних.
 
         Повертає:
-        - User: Об'єкт користувача.
+        - CurrentUser: Дані користувача (id, email, is_verified, avatar).
 
         Викидає:
         - HTTPException 401: якщо токен недійсний.
@@ -135,7 +210,7 @@ class Auth:
 
         try:
             # Decode JWT
-            payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+            payload = self.decode_token(token)
             if payload['scope'] == 'access_token':
                 email = payload["sub"]
                 if email is None:
@@ -145,9 +220,16 @@ class Auth:
         except JWTError as e:
             raise credentials_exception
 
-        user = await repository_users.get_user_by_email(email, db)
+        user = user_cache.get(email)
         if user is None:
-            raise credentials_exception
+            db_user = await repository_users.get_user_by_email(email, db)
+            if db_user is None:
+                raise credentials_exception
+            user = CurrentUser.model_validate(db_user)
+            # confirmation is invalidated only in the worker that handled it, so an
+            # unverified user is looked up again until the flag is seen in the database
+            if user.is_verified:
+                user_cache.set(email, user)
         if not user.is_verified: 
             raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# "cloudinary" or "local"; local is used when Cloudinary is not configured
+AVATAR_STORAGE = os.getenv("AVATAR_STORAGE") or ("cloudinary" if os.getenv("CLOUDINARY_CLOUD_NAME") else "local")
+AVATAR_MAX_BYTES = int(os.getenv("AVATAR_MAX_BYTES", 5 * 1024 * 1024))
+AVATAR_CONTENT_TYPES = {"image/jpeg": ".jpg", "image/png": ".png", "image/gif": ".gif", "image/webp": ".webp"}
+MEDIA_ROOT = Path(os.getenv("MEDIA_ROOT", "media"))
+MEDIA_URL = os.getenv("MEDIA_URL", "http://localhost:8000/media").rstrip("/")
+
+
+class AvatarStorage(ABC):
+    """
+    Інтерфейс сховища аватарів.
+    """
+
+    @abstractmethod
+    async def save(self, path: Path, owner_id: int, content_type: str) -> str:
+        """
+        Зберігає файл аватара користувача.
+
+        Параметри:
+            path (Path): Тимчасовий файл із зображенням; після виклику його можна видалити.
+            owner_id (int): ID користувача.
+            content_type (str): Тип зображення.
+
+        Повертає:
+            str: Публічний URL аватара.
+        """
+
+
+class LocalStorage(AvatarStorage):
+    """
+    Зберігає аватари у ``MEDIA_ROOT/avatars`` і роздає їх через ``/media``.
+    """
+
+    def __init__(self, root: Path = MEDIA_ROOT, base_url: str = MEDIA_URL):
+        self.root = Path(root) / "avatars"
+        self.base_url = base_url
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _store(self, path: Path, owner_id: int, content_type: str) -> str:
+        # a fresh name per upload, so caches of the previous avatar never serve stale bytes
+        name = f"{owner_id}-{uuid.uuid4().hex[:12]}{AVATAR_CONTENT_TYPES.get(content_type, '')}"
+        shutil.move(path, self.root / name)
+        for old in self.root.glob(f"{owner_id}-*"):
+            if old.name != name:
+                old.unlink(missing_ok=True)
+        return name
+
+    async def save(self, path: Path, owner_id: int, content_type: str) -> str:
+        name = await asyncio.to_thread(self._store, path, owner_id, content_type)
+        return f"{self.base_url}/avatars/{name}"
+
+
+class CloudinaryStorage(AvatarStorage):
+    """
+    Завантажує аватари в Cloudinary; блокуючий SDK викликається в пулі потоків.
+    """
+
+    def __init__(self, folder: str = "avatars"):
+        from . import cloudinary_config
+        self.uploader = cloudinary_config.cloudinary.uploader
+        self.folder = folder
+
+    async def save(self, path: Path, owner_id: int, content_type: str) -> str:
+        result = await asyncio.to_thread(
+            self.uploader.upload,
+            str(path),
+            folder=self.folder,
+            public_id=str(owner_id),
+            overwrite=True,
+            resource_type="image",
+        )
+        return result.get("secure_url")
+
+
+STORAGES = {"local": LocalStorage, "cloudinary": CloudinaryStorage}
+
+avatar_storage: AvatarStorage = STORAGES[AVATAR_STORAGE]()
+
+
+def local_path(url: str) -> Path | None:
+    """
+    Шлях до файлу, якщо URL видано ``LocalStorage``, інакше None.
+    """
+    prefix = MEDIA_URL + "/"
+    if not url.startswith(prefix):
+        return None
+    path = (MEDIA_ROOT / url[len(prefix):]).resolve()
+    return path if path.is_relative_to(MEDIA_ROOT.resolve()) else None
+
+
+def media_mount_path() -> str:
+    """
+    Шлях, за яким ``main.py`` монтує локальні файли (шлях із ``MEDIA_URL``).
+    """
+    return urlparse(MEDIA_URL).path or "/media"
@@ -0,0 +1,214 @@
+import asyncio
+import hashlib
+import io
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .storage import MEDIA_ROOT
+from ..utils.cache import caches
+
+AVATAR_SIZES = tuple(sorted(int(s) for s in os.getenv("AVATAR_SIZES", "32,64,128,256").split(",")))
+THUMBNAIL_ROOT = Path(os.getenv("THUMBNAIL_ROOT") or MEDIA_ROOT / "thumbnails")
+THUMBNAIL_CACHE_BYTES = int(os.getenv("THUMBNAIL_CACHE_BYTES", 200 * 1024 * 1024))
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", 2))
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", 80))
+
+# avatar keys and temporary upload keys; never a path separator or ".."
+THUMBNAIL_KEY = re.compile(r"[0-9a-z]{1,64}")
+
+
+def avatar_key(url: str) -> str:
+    """
+    Версія аватара: кожне завантаження має новий URL, тож і нову версію.
+    """
+    return hashlib.sha256(url.encode()).hexdigest()[:16]
+
+
+def thumbnail_key(user_id: int, version: str) -> str:
+    """
+    Ключ мініатюр у кеші: версія прив'язана до власника, тож через URL
+    одного користувача не можна отримати аватар іншого.
+    """
+    return f"u{int(user_id)}v{version}"
+
+
+def nearest_size(size: int) -> int:
+    """
+    Найменший згенерований розмір, не менший за запитаний.
+    """
+    for candidate in AVATAR_SIZES:
+        if candidate >= size:
+            return candidate
+    return AVATAR_SIZES[-1]
+
+
+def render_thumbnails(source: str, root: str, key: str, sizes: tuple, quality: int) -> list:
+    """
+    Створює квадратні WebP-мініатюри зображення (виконується в дочірньому процесі).
+
+    Returns:
+        list: Пари (шлях, розмір у байтах) записаних файлів.
+    """
+    from PIL import Image, ImageOps
+
+    written = []
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        for size in sizes:
+            thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            thumbnail.save(buffer, "WEBP", quality=quality, method=4)
+            path = Path(root) / f"{key}-{size}.webp"
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(buffer.getvalue())
+            os.replace(tmp, path)
+            written.append((str(path), buffer.tell()))
+    return written
+
+
+class ThumbnailCache:
+    """
+    Дисковий LRU-кеш мініатюр з обмеженням загального розміру.
+
+    Давність використання — це mtime файлу (оновлюється при кожному читанні),
+    тож кеш спільний для всіх воркерів, що дивляться в один каталог.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, workers: int = 2):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def path(self, key: str, size: int) -> Path:
+        """
+        Шлях до мініатюри; ``ValueError``, якщо ключ веде за межі каталогу кешу.
+        """
+        if not THUMBNAIL_KEY.fullmatch(key):
+            raise ValueError(f"Invalid thumbnail key: {key!r}")
+        path = self.root / f"{key}-{int(size)}.webp"
+        if path.resolve().parent != self.root.resolve():
+            raise ValueError(f"Invalid thumbnail key: {key!r}")
+        return path
+
+    def get(self, key: str, size: int) -> Path | None:
+        """
+        Повертає шлях до мініатюри, якщо вона є в кеші, і позначає її як використану.
+        """
+        try:
+            path = self.path(key, size)
+        except ValueError:
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    async def generate(self, source: Path, key: str, sizes: tuple = AVATAR_SIZES) -> None:
+        """
+        Генерує мініатюри всіх розмірів у пулі процесів і витісняє старі, якщо кеш переповнено.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        written = await loop.run_in_executor(
+            self.executor(), render_thumbnails, str(source), str(self.root), key, sizes, THUMBNAIL_QUALITY
+        )
+        added = sum(size for _, size in written)
+        with self._lock:
+            if self._size is not None:
+                self._size += added
+            overflow = self._size is None or self._size > self.max_bytes
+        if overflow:
+            await asyncio.to_thread(self.evict)
+
+    def rename(self, old_key: str, new_key: str, sizes: tuple = AVATAR_SIZES) -> None:
+        """
+        Переносить мініатюри під новий ключ (наприклад, коли URL аватара став відомий).
+
+        Файли, які тим часом витіснив інший воркер, пропускаються: мініатюри
+        перегенеровуються з оригіналу під час першого читання.
+        """
+        for size in sizes:
+            try:
+                os.replace(self.path(old_key, size), self.path(new_key, size))
+            except FileNotFoundError:
+                continue
+
+    def remove(self, key: str, sizes: tuple = AVATAR_SIZES) -> None:
+        """
+        Видаляє мініатюри ключа (наприклад, тимчасового, якщо завантаження не вдалося).
+        """
+        removed = 0
+        for size in sizes:
+            path = self.path(key, size)
+            try:
+                removed += path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                continue
+        with self._lock:
+            if self._size is not None:
+                self._size = max(0, self._size - removed)
+
+    def evict(self) -> None:
+        """
+        Видаляє найдавніше використані файли, доки розмір кешу не стане нижчим
+        за 90% ліміту (із запасом, щоб не сканувати каталог після кожного запису).
+        """
+        entries = []
+        for entry in os.scandir(self.root):
+            if entry.name.endswith(".webp"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            target = self.max_bytes * 0.9
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+        with self._lock:
+            self._size = total
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "name": "thumbnails",
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+thumbnail_cache = ThumbnailCache(THUMBNAIL_ROOT, THUMBNAIL_CACHE_BYTES, THUMBNAIL_WORKERS)
+caches["thumbnails"] = thumbnail_cache
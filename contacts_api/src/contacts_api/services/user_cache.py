@@ -0,0 +1,23 @@
+import os
+
+from ..utils.cache import TTLCache
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 60))
+
+# resolved users keyed by token subject (email)
+user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL, name="user")
+
+
+def invalidate_user(email: str | None):
+    """
+    Видаляє користувача з кешу після зміни його даних.
+
+    Кеш локальний для процесу, тож інші воркери побачать зміни
+    не пізніше ніж через ``USER_CACHE_TTL`` секунд.
+
+    Args:
+        email (str): Email користувача (subject токена).
+    """
+    if email:
+        user_cache.pop(email)
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+# named caches, for /internal/cache
+caches = {}
+
+
+class TTLCache:
+    """
+    Обмежений LRU-кеш із часом життя записів.
+
+    Найдавніше використаний запис витісняється, коли кеш заповнено;
+    прострочені записи видаляються під час читання.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, name: str = "cache"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        caches[name] = self
+
+    def get(self, key, default=None):
+        """
+        Повертає значення за ключем або ``default``, якщо запису немає чи він застарів.
+        """
+        with self._lock:
+            item = self._data.get(key, MISSING)
+            if item is not MISSING:
+                expires_at, value = item
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: float | None = None):
+        """
+        Зберігає значення; ``ttl`` перекриває час життя за замовчуванням.
+        """
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        """
+        Видаляє запис, якщо він є.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """
+        Розмір кешу та лічильники влучань/промахів.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
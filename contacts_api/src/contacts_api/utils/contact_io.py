@@ -0,0 +1,160 @@
+import codecs
+import csv
+import io
+import json
+from typing import AsyncIterator
+
+from pydantic import ValidationError
+
+from ..schemas import ContactCreate
+
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+EXPORT_COLUMNS = ("id", "name", "email", "phone", "birthday", "about")
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+# a quoted CSV field may span lines, but an unbalanced quote must not swallow the whole file
+CSV_MAX_RECORD_LINES = 100
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Розбиває потік байтів на рядки, не зберігаючи весь потік у пам'яті.
+
+    Args:
+        chunks (AsyncIterator[bytes]): Частини тіла запиту.
+
+    Yields:
+        str: Рядки без символу переводу рядка.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    async for chunk in chunks:
+        lines = (tail + decoder.decode(chunk)).split("\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.rstrip("\r")
+
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict]]:
+    """
+    Читає CSV із заголовком; поля в лапках можуть містити перевід рядка.
+
+    Yields:
+        tuple: Номер рядка даних (з 1) і словник полів.
+    """
+    header = None
+    pending = []
+    row_number = 0
+    async for line in lines:
+        pending.append(line)
+        # an odd number of quotes means a quoted field continues on the next line
+        if sum(part.count('"') for part in pending) % 2:
+            if len(pending) < CSV_MAX_RECORD_LINES:
+                continue
+            pending = []
+            row_number += 1
+            yield row_number, None
+            continue
+        record = "\n".join(pending)
+        pending = []
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row_number += 1
+        yield row_number, {key: value if value != "" else None for key, value in zip(header, values)}
+    if pending:
+        row_number += 1
+        yield row_number, None
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict]]:
+    """
+    Читає NDJSON: один JSON-об'єкт у кожному непорожньому рядку.
+
+    Yields:
+        tuple: Номер рядка (з 1) і об'єкт або None, якщо рядок не є JSON-об'єктом.
+    """
+    row_number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield row_number, record if isinstance(record, dict) else None
+
+
+async def iter_contact_batches(chunks: AsyncIterator[bytes], fmt: str, batch_size: int) -> AsyncIterator[tuple[list, list]]:
+    """
+    Перевіряє записи імпорту через ``ContactCreate`` пачками.
+
+    Args:
+        chunks (AsyncIterator[bytes]): Потік тіла запиту.
+        fmt (str): ``csv`` або ``ndjson``.
+        batch_size (int): Кількість записів у пачці.
+
+    Yields:
+        tuple: Валідні контакти пачки як ``(номер рядка, ContactCreate)`` та помилки у форматі ``{"row": n, "errors": [...]}``.
+    """
+    reader = iter_csv_records if fmt == "csv" else iter_ndjson_records
+    valid, errors = [], []
+    async for row_number, record in reader(iter_lines(chunks)):
+        if record is None:
+            errors.append({"row": row_number, "errors": [f"Malformed {fmt} record"]})
+        else:
+            try:
+                valid.append((row_number, ContactCreate.model_validate(record)))
+            except ValidationError as e:
+                errors.append({
+                    "row": row_number,
+                    "errors": [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()],
+                })
+        if len(valid) + len(errors) >= batch_size:
+            yield valid, errors
+            valid, errors = [], []
+    if valid or errors:
+        yield valid, errors
+
+
+async def iter_export_chunks(partitions: AsyncIterator[list], fmt: str) -> AsyncIterator[bytes]:
+    """
+    Серіалізує рядки експорту по одному шматку на кожну пачку рядків з курсора.
+
+    Args:
+        partitions (AsyncIterator[list]): Пачки рядків з колонками ``EXPORT_COLUMNS``.
+        fmt (str): ``csv`` або ``ndjson``.
+
+    Yields:
+        bytes: Готові до відправки дані.
+    """
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(EXPORT_COLUMNS)
+        async for rows in partitions:
+            writer.writerows(rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+    else:
+        async for rows in partitions:
+            yield "".join(
+                json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False, default=str) + "\n" for row in rows
+            ).encode()
@@ -1,40 +1,177 @@
+import asyncio
 import os
-import smtplib
+import time
+from contextlib import asynccontextmanager
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from pathlib import Path
+
+import aiosmtplib
 from jinja2 import Environment, FileSystemLoader
 
 from dotenv import load_dotenv
 load_dotenv()
 
-BASE_DIR = Path(__file__).resolve().parent.parent 
+from .metrics import EMAIL_SEND_LATENCY
+
+BASE_DIR = Path(__file__).resolve().parent.parent
 TEMPLATES_DIR = BASE_DIR / "templates"
 
 
 env = Environment(loader=FileSystemLoader(str(TEMPLATES_DIR)), autoescape=True)
+# compiled once at import instead of on every email
+verify_template = env.get_template("email_verify.html")
 
 SMTP_SERVER = os.getenv("SMTP_SERVER")
-SMTP_PORT = os.getenv("SMTP_PORT")
+SMTP_PORT = int(os.getenv("SMTP_PORT") or 465)
 SMTP_USER = os.getenv("SMTP_USER")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() in ("1", "true", "yes")
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", 2))
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", 30))
+# connections idle for longer are checked with NOOP before reuse
+SMTP_IDLE_CHECK = float(os.getenv("SMTP_IDLE_CHECK", 30))
+
+
+class SMTPPool:
+    """
+    Пул постійних асинхронних SMTP-з'єднань.
+
+    З'єднання відкриваються ліниво (не більше ``size``), повертаються в пул
+    після відправки і перевідкриваються, якщо сервер їх розірвав.
+    """
+
+    def __init__(self, hostname: str, port: int, username: str | None = None, password: str | None = None,
+                 use_tls: bool = True, size: int = 2, timeout: float = 30, idle_check: float = 30):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.timeout = timeout
+        self.idle_check = idle_check
+        self._idle = []
+        self._slots = None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # created lazily so the pool can be built at import time, outside a running loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        return self._slots
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            use_tls=self.use_tls,
+            timeout=self.timeout,
+        )
+        await client.connect()
+        return client
+
+    async def _checkout(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            client, released_at = self._idle.pop()
+            if not client.is_connected:
+                continue
+            if time.monotonic() - released_at > self.idle_check:
+                try:
+                    await client.noop()
+                except aiosmtplib.SMTPException:
+                    client.close()
+                    continue
+            return client
+        return await self._connect()
 
+    @asynccontextmanager
+    async def connection(self):
+        """
+        Видає з'єднання з пулу на час блоку ``async with``.
 
-def send_verification_email(to_email: str, verify_link: str, subject: str = "Підтвердіть email"):
-    
-    template = env.get_template("email_verify.html")
-    body = template.render(verify_link=verify_link)
+        Після помилки з'єднання воно закривається і не повертається в пул.
+        """
+        async with self._semaphore():
+            client = await self._checkout()
+            reusable = False
+            try:
+                yield client
+                reusable = True
+            except aiosmtplib.SMTPResponseException:
+                # the server rejected a command but the session is still usable
+                reusable = True
+                raise
+            finally:
+                if reusable and client.is_connected:
+                    self._idle.append((client, time.monotonic()))
+                else:
+                    client.close()
 
+    async def send_many(self, messages: list) -> list:
+        """
+        Відправляє пачку листів через одну SMTP-сесію.
+
+        Якщо з'єднання обірвалось, відправка продовжується на новому; якщо
+        і воно не вдалося, решта листів позначається помилкою.
+
+        Returns:
+            list: Для кожного листа None або виняток, з яким він не був відправлений.
+        """
+        results = []
+        retried = False
+        while len(results) < len(messages):
+            try:
+                async with self.connection() as client:
+                    for message in messages[len(results):]:
+                        try:
+                            with EMAIL_SEND_LATENCY.time():
+                                await client.send_message(message)
+                            results.append(None)
+                        except aiosmtplib.SMTPServerDisconnected:
+                            raise
+                        except aiosmtplib.SMTPException as e:
+                            results.append(e)
+                        retried = False
+            except (aiosmtplib.SMTPException, OSError) as e:
+                if retried:
+                    results += [e] * (len(messages) - len(results))
+                    break
+                retried = True
+        return results
+
+    async def close(self):
+        """
+        Закриває всі вільні з'єднання.
+        """
+        idle, self._idle = self._idle, []
+        for client, _ in idle:
+            try:
+                await client.quit()
+            except (aiosmtplib.SMTPException, OSError):
+                client.close()
+
+
+smtp_pool = SMTPPool(
+    SMTP_SERVER,
+    SMTP_PORT,
+    username=SMTP_USER,
+    password=SMTP_PASSWORD,
+    use_tls=SMTP_USE_TLS,
+    size=SMTP_POOL_SIZE,
+    timeout=SMTP_TIMEOUT,
+    idle_check=SMTP_IDLE_CHECK,
+)
+
+
+def build_verification_email(to_email: str, verify_link: str, subject: str = "Підтвердіть email") -> MIMEMultipart:
+    body = verify_template.render(verify_link=verify_link)
 
     msg = MIMEMultipart()
     msg["From"] = SMTP_USER
     msg["To"] = to_email
     msg["Subject"] = subject
 
- 
     msg.attach(MIMEText(body, "html", "utf-8"))
-
-    with smtplib.SMTP_SSL(SMTP_SERVER, SMTP_PORT) as server:
-        server.login(SMTP_USER, SMTP_PASSWORD)
-        server.sendmail(SMTP_USER, to_email, msg.as_string())
-        print(f"Лист відправлено на {to_email}")
+    return msg
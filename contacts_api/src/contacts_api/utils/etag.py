@@ -0,0 +1,63 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+def contact_etag(contact) -> str:
+    """
+    Сильний ETag контакту: змінюється при кожному оновленні разом з ``version``.
+    """
+    return f'"{contact.id}-{contact.version}"'
+
+
+def list_etag(contacts, *extra) -> str:
+    """
+    ETag списку: хеш ID і версій елементів у порядку видачі (плюс курсор тощо).
+    """
+    digest = hashlib.sha1()
+    for contact in contacts:
+        digest.update(f"{contact.id}-{contact.version},".encode())
+    for part in extra:
+        digest.update(f"|{part}".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def parse_etags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    """
+    Відповідь 304, якщо ``If-None-Match`` містить поточний ETag (слабке порівняння).
+    """
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return None
+    tags = [tag.removeprefix("W/") for tag in parse_etags(header)]
+    if "*" in tags or etag in tags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
+
+
+def if_match_versions(request: Request, contact_id: int) -> list[int] | None:
+    """
+    Версії контакту, дозволені заголовком ``If-Match``.
+
+    Returns:
+        list[int] | None: None, якщо заголовка немає або він ``*``; інакше версії
+        з сильних ETag цього контакту (порожній список — жоден ETag не підходить).
+    """
+    header = request.headers.get("if-match")
+    if header is None:
+        return None
+    tags = parse_etags(header)
+    if "*" in tags:
+        return None
+    versions = []
+    for tag in tags:
+        # weak ETags never match in If-Match (strong comparison)
+        if tag.startswith('"') and tag.endswith('"'):
+            contact, _, version = tag[1:-1].partition("-")
+            if contact == str(contact_id) and version.isdigit():
+                versions.append(int(version))
+    return versions
@@ -1,4 +1,56 @@
-from slowapi import Limiter
+import os
+
+from fastapi import Request
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 
-limiter = Limiter(key_func=get_remote_address)
\ No newline at end of file
+from . import limiter_storage  # noqa: F401  registers the sqlite:// scheme in limits
+from .metrics import RATE_LIMIT_REJECTIONS, route_label
+from ..services.auth import auth_service
+
+# sqlite:// is shared by all workers on the host, redis://host:6379 by all hosts,
+# memory:// keeps per-process counters; the default file is private to this deployment
+# (relative to the working directory, next to the response cache generations)
+RATE_LIMIT_STORAGE_URI = os.getenv(
+    "RATE_LIMIT_STORAGE_URI", f"sqlite:///{os.path.join('var', 'rate_limits.db')}"
+)
+RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "sliding-window-counter")
+# switched off only for load benchmarks, which would otherwise measure 429s
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def get_rate_limit_key(request: Request) -> str:
+    """
+    Ключ ліміту: ID користувача з access-токена, а без токена — IP-адреса.
+
+    Токен лише декодується (через кеш ``decode_token``), без запиту до бази.
+    Враховуються тільки access-токени з ``uid``: refresh-токен чи зміна email
+    не дають окремої квоти. Недійсний токен рахується як анонімний запит.
+    """
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            payload = auth_service.decode_token(token)
+        except Exception:
+            payload = {}
+        if payload.get("scope") == "access_token" and payload.get("uid") is not None:
+            return f"user:{payload['uid']}"
+    return f"ip:{get_remote_address(request)}"
+
+
+limiter = Limiter(
+    key_func=get_rate_limit_key,
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+    strategy=RATE_LIMIT_STRATEGY,
+    enabled=RATE_LIMIT_ENABLED,
+)
+
+
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    """
+    Відповідь 429 від slowapi; відмова рахується в метриці ``rate_limit_rejections_total``.
+    """
+    RATE_LIMIT_REJECTIONS.labels(route_label(request.scope)).inc()
+    return _rate_limit_exceeded_handler(request, exc)
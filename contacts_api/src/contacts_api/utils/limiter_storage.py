@@ -0,0 +1,175 @@
+import functools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from math import floor
+from pathlib import Path
+
+from limits.storage.base import SlidingWindowCounterSupport, Storage, TimestampedSlidingWindow
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limits (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+INCR = """
+INSERT INTO rate_limits (key, value, expires_at) VALUES (:key, :amount, :expires_at)
+ON CONFLICT (key) DO UPDATE SET
+    value = CASE WHEN expires_at <= :now THEN excluded.value ELSE value + excluded.value END,
+    expires_at = CASE WHEN expires_at <= :now THEN excluded.expires_at ELSE expires_at END
+RETURNING value
+"""
+
+# expired rows are purged at most this often (seconds) by each process
+PURGE_INTERVAL = 60
+# slowapi calls the storage on the event loop: wait for another worker's lock only briefly
+RATE_LIMIT_STORAGE_TIMEOUT = float(os.getenv("RATE_LIMIT_STORAGE_TIMEOUT", 0.05))
+
+logger = logging.getLogger(__name__)
+
+
+def fail_open(default):
+    """
+    Якщо файл заблоковано чи недоступний, запит пропускається (повертається
+    ``default``), а не чекає й не падає: ліміт — захист, а не умова роботи.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            except sqlite3.OperationalError as e:
+                logger.warning("rate limit storage unavailable, request allowed: %s", e)
+                return default
+        return wrapper
+    return decorator
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """
+    Сховище лічильників ``limits`` у файлі SQLite, спільне для всіх воркерів на хості.
+
+    Кожна перевірка — одна коротка транзакція з двома пошуками за первинним
+    ключем і одним upsert, тобто O(1) незалежно від кількості запитів.
+    Лічильники не потребують надійності, тому ``synchronous=OFF``. Файл
+    містить ключі з ID користувачів, тому створюється з правами 0600 у
+    каталозі 0700. Блокування чекає не довше ``RATE_LIMIT_STORAGE_TIMEOUT``,
+    після чого запит пропускається без перевірки ліміту.
+
+    URI: ``sqlite:///relative/path.db`` або ``sqlite:////absolute/path.db``.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, timeout: float = RATE_LIMIT_STORAGE_TIMEOUT, **options):
+        self.path = uri[len("sqlite:///"):] or ":memory:"
+        self.timeout = float(timeout)
+        self._local = threading.local()
+        self._last_purge = 0.0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+                # sqlite3 would create the file world-readable
+                os.close(os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600))
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def _purge(self, connection: sqlite3.Connection, now: float):
+        if now - self._last_purge > PURGE_INTERVAL:
+            self._last_purge = now
+            connection.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+
+    @staticmethod
+    def _value(connection: sqlite3.Connection, key: str, now: float) -> int:
+        row = connection.execute(
+            "SELECT value FROM rate_limits WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else 0
+
+    @fail_open(0)
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        connection = self._connection()
+        value = connection.execute(INCR, {"key": key, "amount": amount, "expires_at": now + expiry, "now": now}).fetchone()[0]
+        self._purge(connection, now)
+        return value
+
+    @fail_open(0)
+    def get(self, key: str) -> int:
+        return self._value(self._connection(), key, time.time())
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT expires_at FROM rate_limits WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    def check(self) -> bool:
+        try:
+            self._connection().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int | None:
+        return self._connection().execute("DELETE FROM rate_limits").rowcount
+
+    def clear(self, key: str) -> None:
+        self._connection().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    def _sliding_window(self, connection: sqlite3.Connection, key: str, expiry: int, now: float):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count = self._value(connection, previous_key, now)
+        current_count = self._value(connection, current_key, now)
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_key, current_key, previous_count, previous_ttl, current_count, current_ttl
+
+    @fail_open(True)
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        connection = self._connection()
+        # the write lock is taken up front, so read-check-increment is atomic across processes
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            _, current_key, previous_count, previous_ttl, current_count, _ = self._sliding_window(connection, key, expiry, now)
+            if floor(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+                connection.execute("COMMIT")
+                return False
+            connection.execute(INCR, {"key": current_key, "amount": amount, "expires_at": now + 2 * expiry, "now": now})
+            self._purge(connection, now)
+            connection.execute("COMMIT")
+            return True
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    @fail_open((0, 0.0, 0, 0.0))
+    def get_sliding_window(self, key: str, expiry: int) -> tuple[int, float, int, float]:
+        return self._sliding_window(self._connection(), key, expiry, time.time())[2:]
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self.clear(previous_key)
+        self.clear(current_key)
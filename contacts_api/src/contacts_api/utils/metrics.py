@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from ..database import pool_status
+from .cache import caches
+
+# with several uvicorn workers point PROMETHEUS_MULTIPROC_DIR at an empty directory
+# shared by all of them (wiped on deploy): every process writes its samples there
+# and /metrics merges them, so any worker answers for the whole server
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+# how often per-process stats (caches, DB pool) are copied into metrics
+METRICS_SYNC_INTERVAL = float(os.getenv("METRICS_SYNC_INTERVAL", 5))
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests", ["method", "route", "status"])
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+HTTP_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being handled", multiprocess_mode="livesum")
+RATE_LIMIT_REJECTIONS = Counter("rate_limit_rejections_total", "Requests rejected by the rate limiter", ["route"])
+
+EMAIL_SEND_LATENCY = Histogram(
+    "email_send_duration_seconds", "Time to send one email over SMTP",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+EMAILS_SENT = Counter("emails_sent_total", "Emails sent from the outbox", ["kind"])
+EMAIL_FAILURES = Counter("email_send_failures_total", "Failed email send attempts", ["kind"])
+
+CACHE_HITS = Counter("cache_hits_total", "Cache hits", ["cache"])
+CACHE_MISSES = Counter("cache_misses_total", "Cache misses", ["cache"])
+
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "Connections of the async engine pool", ["state"], multiprocess_mode="livesum"
+)
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Connections taken from the pool")
+DB_POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Pool checkouts that timed out")
+DB_POOL_WAIT = Counter("db_pool_wait_seconds_total", "Time spent waiting for a pool connection")
+
+
+def route_label(scope: dict) -> str:
+    """
+    Шаблон маршруту для міток; невідомі шляхи зводяться до одного значення,
+    щоб сканери не створювали нові часові ряди.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class ProcessStatsSync:
+    """
+    Переносить лічильники процесу (кеші, пул з'єднань) у метрики.
+
+    Кеші та пул рахують самі, а сюди раз на ``METRICS_SYNC_INTERVAL`` секунд
+    додаються прирости, тож у гарячому шляху метрики не оновлюються.
+    """
+
+    def __init__(self, interval: float = METRICS_SYNC_INTERVAL):
+        self.interval = interval
+        self._synced_at = 0.0
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def _advance(self, counter, key, value: float):
+        last = self._seen.get(key, 0)
+        # the source was reset: count from zero again
+        delta = value - last if value >= last else value
+        if delta:
+            counter.inc(delta)
+        self._seen[key] = value
+
+    def __call__(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._synced_at < self.interval:
+            return
+        with self._lock:
+            self._synced_at = now
+            for cache in list(caches.values()):
+                stats = cache.stats()
+                self._advance(CACHE_HITS.labels(stats["name"]), ("hits", stats["name"]), stats["hits"])
+                self._advance(CACHE_MISSES.labels(stats["name"]), ("misses", stats["name"]), stats["misses"])
+
+            pool = pool_status()
+            for state in ("checked_out", "idle"):
+                if state in pool:
+                    DB_POOL_CONNECTIONS.labels(state).set(pool[state])
+            self._advance(DB_POOL_CHECKOUTS, "checkouts", pool["checkouts"])
+            self._advance(DB_POOL_TIMEOUTS, "timeouts", pool["timeouts"])
+            self._advance(DB_POOL_WAIT, "wait", pool["wait_total_ms"] / 1000)
+
+
+sync_process_stats = ProcessStatsSync()
+
+
+class MetricsMiddleware:
+    """
+    Чистий ASGI-middleware: кількість, тривалість і кількість активних HTTP-запитів.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_PROGRESS.dec()
+            route = route_label(scope)
+            HTTP_REQUESTS.labels(scope["method"], route, str(status)).inc()
+            HTTP_LATENCY.labels(scope["method"], route).observe(time.perf_counter() - started)
+            sync_process_stats()
+
+
+def metrics_registry():
+    """
+    Реєстр для експорту: у multiprocess-режимі — зібраний з файлів усіх процесів.
+    """
+    if not PROMETHEUS_MULTIPROC_DIR:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics() -> bytes:
+    sync_process_stats(force=True)
+    return generate_latest(metrics_registry())
+
+
+def mark_process_dead():
+    """
+    Прибирає живі gauge-и процесу, що завершується (лише в multiprocess-режимі).
+    """
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,40 @@
+import base64
+import binascii
+import json
+
+
+def encode_cursor(values: dict) -> str:
+    """
+    Кодує позицію сторінки в непрозорий рядок-курсор.
+
+    Args:
+        values (dict): Значення ключів сортування останнього елемента сторінки.
+
+    Returns:
+        str: Курсор у форматі base64url без вирівнювання.
+    """
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Декодує курсор, отриманий від ``encode_cursor``.
+
+    Args:
+        cursor (str): Курсор з попередньої відповіді.
+
+    Returns:
+        dict: Значення ключів сортування.
+
+    Raises:
+        ValueError: якщо курсор пошкоджений.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, dict):
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,136 @@
+import logging
+import os
+import random
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+# off by default: neither the middleware nor the engine listeners are installed
+PROFILING = os.getenv("PROFILING", "false").lower() in ("1", "true", "yes")
+# share of requests written to the log (0..1)
+PROFILING_LOG_SAMPLE_RATE = float(os.getenv("PROFILING_LOG_SAMPLE_RATE", 0.0))
+# the same statement this many times in one request is reported as N+1
+PROFILING_REPEAT_THRESHOLD = int(os.getenv("PROFILING_REPEAT_THRESHOLD", 5))
+
+logger = logging.getLogger(__name__)
+
+# runs of bind placeholders (IN lists, multi-row VALUES) collapse to one pattern
+PLACEHOLDERS = re.compile(r"(?:\?|%s|%\(\w+\)s(?:::\w+)?|\$\d+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s(?:::\w+)?|\$\d+))+")
+
+
+class RequestProfile:
+    """
+    Облік одного HTTP-запиту: загальний час, час у базі та виконані SQL-шаблони.
+    """
+
+    __slots__ = ("scope", "started", "db_time", "statements", "patterns")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.db_time = 0.0
+        self.statements = 0
+        self.patterns = Counter()
+
+    @property
+    def route(self) -> str:
+        """
+        Шаблон маршруту (``/contacts/{contact_id}``), коли роутер його вже визначив.
+        """
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope.get("path", "")
+
+    def record(self, statement: str, seconds: float):
+        self.db_time += seconds
+        self.statements += 1
+        self.patterns[PLACEHOLDERS.sub("?", statement)] += 1
+
+    def repeated(self, threshold: int = PROFILING_REPEAT_THRESHOLD) -> list[tuple[str, int]]:
+        """
+        Шаблони, виконані щонайменше ``threshold`` разів (ознака N+1).
+        """
+        return [(pattern, count) for pattern, count in self.patterns.most_common() if count >= threshold]
+
+    def server_timing(self, total: float) -> str:
+        duplicates = sum(count - 1 for count in self.patterns.values())
+        return (
+            f'app;dur={total * 1000:.1f}, '
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.statements} queries, {duplicates} repeated"'
+        )
+
+
+current_profile: ContextVar[RequestProfile | None] = ContextVar("current_profile", default=None)
+
+
+class ProfilingMiddleware:
+    """
+    Чистий ASGI-middleware: додає ``Server-Timing`` з часом запиту та бази
+    й за потреби пише профіль у лог.
+
+    Підключається лише з ``PROFILING=true``; SQL рахують слухачі з
+    :func:`install_query_listeners`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope)
+        token = current_profile.set(profile)
+        status = None
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timing = profile.server_timing(time.perf_counter() - profile.started)
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(token)
+            log_profile(profile, scope.get("method", ""), status, time.perf_counter() - profile.started)
+
+
+def log_profile(profile: RequestProfile, method: str, status: int | None, total: float):
+    repeated = profile.repeated()
+    if repeated:
+        pattern, count = repeated[0]
+        logger.warning(
+            "N+1 suspect: %s %s ran %s times in one request (%s queries, %.1f ms db): %s",
+            method, profile.route, count, profile.statements, profile.db_time * 1000, pattern[:500],
+        )
+    elif PROFILING_LOG_SAMPLE_RATE and random.random() < PROFILING_LOG_SAMPLE_RATE:
+        logger.info(
+            "%s %s %s %.1f ms total, %.1f ms db, %s queries",
+            method, profile.route, status, total * 1000, profile.db_time * 1000, profile.statements,
+        )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_profile.get() is not None:
+        context._profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    started = getattr(context, "_profile_started", None)
+    if profile is not None and started is not None:
+        profile.record(statement, time.perf_counter() - started)
+
+
+def install_query_listeners(engine):
+    """
+    Підключає облік SQL до рушія (для ``AsyncEngine`` — до ``engine.sync_engine``).
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,191 @@
+import asyncio
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from fastapi import Request, Response
+
+from .cache import MISSING, TTLCache
+from .etag import not_modified
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 10000))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", 300))
+# where per-owner generations live: sqlite:///path is shared by all workers on the host,
+# memory:// is per process (only correct with a single worker); the default path is
+# relative to the working directory, like MEDIA_ROOT, so it is private to this deployment
+RESPONSE_CACHE_GENERATIONS = os.getenv(
+    "RESPONSE_CACHE_GENERATIONS", f"sqlite:///{os.path.join('var', 'response_cache_generations.db')}"
+)
+# how long a generation read or bump waits for another worker's write lock
+RESPONSE_CACHE_GENERATIONS_TIMEOUT = float(os.getenv("RESPONSE_CACHE_GENERATIONS_TIMEOUT", 1))
+
+
+class MemoryGenerations:
+    """
+    Лічильники поколінь власників у пам'яті процесу.
+    """
+
+    def __init__(self):
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    async def get(self, owner_id: int) -> int:
+        return self._generations.get(owner_id, 0)
+
+    async def bump(self, owner_id: int) -> None:
+        with self._lock:
+            self._generations[owner_id] = self._generations.get(owner_id, 0) + 1
+
+
+class SQLiteGenerations:
+    """
+    Лічильники поколінь власників у файлі SQLite, спільні для всіх воркерів на хості.
+
+    Читання — один пошук за первинним ключем, запис — один upsert. Обидва
+    виконуються в потоці (``asyncio.to_thread``), тож очікування на блокування
+    файлу іншим воркером не зупиняє цикл подій.
+    """
+
+    def __init__(self, path: str, timeout: float = RESPONSE_CACHE_GENERATIONS_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            Path(self.path).parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS owner_generations "
+                "(owner_id INTEGER PRIMARY KEY, generation INTEGER NOT NULL)"
+            )
+            self._local.connection = connection
+        return connection
+
+    def _get(self, owner_id: int) -> int:
+        row = self._connection().execute(
+            "SELECT generation FROM owner_generations WHERE owner_id = ?", (owner_id,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _bump(self, owner_id: int) -> None:
+        self._connection().execute(
+            "INSERT INTO owner_generations (owner_id, generation) VALUES (?, 1) "
+            "ON CONFLICT (owner_id) DO UPDATE SET generation = generation + 1",
+            (owner_id,),
+        )
+
+    async def get(self, owner_id: int) -> int:
+        return await asyncio.to_thread(self._get, owner_id)
+
+    async def bump(self, owner_id: int) -> None:
+        await asyncio.to_thread(self._bump, owner_id)
+
+
+def generations_from_uri(uri: str):
+    if uri.startswith("sqlite:///"):
+        return SQLiteGenerations(uri[len("sqlite:///"):])
+    if uri == "memory://":
+        return MemoryGenerations()
+    raise ValueError(f"Unsupported RESPONSE_CACHE_GENERATIONS: {uri}")
+
+
+class CachedResponse:
+    """
+    Відповідь для кешу: ETag і тіло, яке серіалізується лише тоді, коли вперше
+    знадобиться, тож 304 не платить за серіалізацію навіть на промаху.
+    """
+
+    __slots__ = ("etag", "_body", "_render")
+
+    def __init__(self, etag: str, render):
+        self.etag = etag
+        self._body = None
+        self._render = render
+
+    @property
+    def body(self) -> bytes:
+        if self._body is None:
+            self._body = self._render()
+            self._render = None
+        return self._body
+
+    def response(self, request: Request) -> Response:
+        """
+        Готова відповідь: 304, якщо ``If-None-Match`` збігається, інакше збережене тіло.
+        """
+        return not_modified(request, self.etag) or Response(
+            content=self.body, media_type="application/json", headers={"ETag": self.etag}
+        )
+
+
+class ResponseCache:
+    """
+    Кеш готових відповідей на читання, ключований власником, поколінням і запитом.
+
+    Кожен запис у ``crud.py`` збільшує покоління власника, тож усі його
+    збережені відповіді стають недосяжними (і згодом витісняються LRU).
+    Одночасні промахи з однаковим ключем об'єднуються: запит до бази
+    виконує лише перший, решта чекають на його результат.
+    """
+
+    def __init__(self, cache: TTLCache, generations):
+        self.cache = cache
+        self.generations = generations
+        self.coalesced = 0
+        self._inflight = {}
+
+    async def invalidate(self, owner_id: int) -> None:
+        await self.generations.bump(owner_id)
+
+    async def get_or_load(self, owner_id: int, key: tuple, loader):
+        """
+        Повертає збережене значення або викликає ``loader()`` (один раз на ключ).
+        """
+        full_key = (owner_id, await self.generations.get(owner_id)) + key
+        value = self.cache.get(full_key, MISSING)
+        if value is not MISSING:
+            return value
+
+        future = self._inflight.get(full_key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # the loading request was cancelled (client went away): load here instead
+                if not future.cancelled():
+                    raise
+            return await self.get_or_load(owner_id, key, loader)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(full_key, None)
+        self.cache.set(full_key, value)
+        future.set_result(value)
+        return value
+
+
+response_cache = ResponseCache(
+    TTLCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL, name="response"),
+    generations_from_uri(RESPONSE_CACHE_GENERATIONS),
+)
+
+
+async def invalidate_owner(owner_id: int) -> None:
+    await response_cache.invalidate(owner_id)
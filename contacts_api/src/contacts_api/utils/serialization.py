@@ -0,0 +1,28 @@
+import os
+
+import orjson
+
+from ..schemas import Contact
+
+# opt-in: read endpoints select plain rows and serialize them with orjson,
+# skipping ORM objects and pydantic validation of our own output
+FAST_SERIALIZATION = os.getenv("FAST_SERIALIZATION", "false").lower() in ("1", "true", "yes")
+
+CONTACT_FIELDS = tuple(Contact.model_fields)
+
+
+def contact_dict(row) -> dict:
+    """
+    Поля відповіді з рядка, вибраного за ``crud.CONTACT_ROW_COLUMNS``.
+
+    Колонки йдуть у порядку полів ``schemas.Contact``, тому ``version``
+    в кінці рядка відкидається ``zip``.
+    """
+    return dict(zip(CONTACT_FIELDS, row))
+
+
+def contact_page_json(rows, next_cursor: str | None) -> bytes:
+    """
+    Тіло ``ContactPage`` з рядків; байт у байт збігається з ``model_dump_json``.
+    """
+    return orjson.dumps({"items": [contact_dict(row) for row in rows], "next_cursor": next_cursor})
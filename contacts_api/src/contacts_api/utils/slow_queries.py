@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import os
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from .profiling import PLACEHOLDERS
+
+# statements slower than this are logged; 0 switches the log (and its listeners) off
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 0))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+# the same statement is reported at most once per interval; repeats are only counted
+SLOW_QUERY_REPORT_INTERVAL = float(os.getenv("SLOW_QUERY_REPORT_INTERVAL", 60))
+# upper bound on reports (and EXPLAIN runs) per minute across all statements
+SLOW_QUERY_MAX_REPORTS = int(os.getenv("SLOW_QUERY_MAX_REPORTS", 20))
+SLOW_QUERY_EXPLAIN_TIMEOUT = float(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT", 5))
+
+EXPLAIN_PREFIXES = {"postgresql": "EXPLAIN ", "sqlite": "EXPLAIN QUERY PLAN "}
+EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+
+logger = logging.getLogger(__name__)
+
+current_scope: ContextVar[dict | None] = ContextVar("slow_query_scope", default=None)
+
+
+def parameter_shape(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameters_shape(parameters, executemany: bool):
+    """
+    Типи (і довжини) параметрів без самих значень, щоб у лог не потрапили персональні дані.
+    """
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "first": parameters_shape(rows[0], False) if rows else None}
+    if isinstance(parameters, dict):
+        return {name: parameter_shape(value) for name, value in parameters.items()}
+    return [parameter_shape(value) for value in parameters or ()]
+
+
+def calling_route() -> str:
+    scope = current_scope.get()
+    if scope is None:
+        return "-"
+    route = getattr(scope.get("route"), "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {route}"
+
+
+class SlowQueryMiddleware:
+    """
+    Чистий ASGI-middleware: запам'ятовує поточний запит, щоб у лозі був маршрут.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
+
+
+class SlowQueryLog:
+    """
+    Журнал повільних запитів з планом ``EXPLAIN``.
+
+    Кожен шаблон запиту звітується не частіше за ``report_interval``, а всього
+    звітів не більше ``max_reports`` на хвилину, тож під навантаженням сам
+    журнал не стає вузьким місцем. План отримується у фоновій задачі на
+    окремому з'єднанні (без ``ANALYZE`` — запит не виконується вдруге).
+    """
+
+    def __init__(self, engine: AsyncEngine, threshold_ms: float, explain: bool = True,
+                 report_interval: float = SLOW_QUERY_REPORT_INTERVAL, max_reports: int = SLOW_QUERY_MAX_REPORTS):
+        self.engine = engine
+        self.threshold = threshold_ms / 1000
+        self.explain = explain and engine.dialect.name in EXPLAIN_PREFIXES
+        self.report_interval = report_interval
+        self.max_reports = max_reports
+        self._reported = {}
+        self._suppressed = {}
+        self._window_started = 0.0
+        self._window_reports = 0
+        self._explain_engine = None
+        self._tasks = set()
+
+    def install(self):
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(self.engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_slow_query_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if elapsed >= self.threshold:
+            self.record(statement, parameters, executemany, elapsed)
+
+    def _allow(self, pattern: str, now: float) -> bool:
+        if now - self._reported.get(pattern, -self.report_interval) < self.report_interval:
+            self._suppressed[pattern] = self._suppressed.get(pattern, 0) + 1
+            return False
+        if now - self._window_started >= 60:
+            self._window_started, self._window_reports = now, 0
+        if self._window_reports >= self.max_reports:
+            self._suppressed[pattern] = self._suppressed.get(pattern, 0) + 1
+            return False
+        self._window_reports += 1
+        if len(self._reported) > 1000:
+            self._reported = {key: at for key, at in self._reported.items() if now - at < self.report_interval}
+        self._reported[pattern] = now
+        return True
+
+    def record(self, statement: str, parameters, executemany: bool, elapsed: float):
+        pattern = PLACEHOLDERS.sub("?", statement)
+        if not self._allow(pattern, time.monotonic()):
+            return
+        report = {
+            "ms": elapsed * 1000,
+            "route": calling_route(),
+            "statement": statement,
+            "shape": parameters_shape(parameters, executemany),
+            "suppressed": self._suppressed.pop(pattern, 0),
+        }
+        if self.explain and statement.lstrip().lower().startswith(EXPLAINABLE):
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                first = parameters[0] if executemany and parameters else parameters
+                task = loop.create_task(self._explain_and_log(report, statement, first))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                return
+        self.log(report, None)
+
+    async def _explain_and_log(self, report: dict, statement: str, parameters):
+        try:
+            plan = await asyncio.wait_for(self.explain_plan(statement, parameters), SLOW_QUERY_EXPLAIN_TIMEOUT)
+        except Exception as e:
+            plan = f"(EXPLAIN failed: {e!r})"
+        self.log(report, plan)
+
+    async def explain_plan(self, statement: str, parameters) -> str:
+        if self._explain_engine is None:
+            # own connections, so EXPLAIN never waits for (or holds) an application pool slot
+            self._explain_engine = create_async_engine(self.engine.url, poolclass=NullPool)
+        async with self._explain_engine.connect() as conn:
+            result = await conn.exec_driver_sql(EXPLAIN_PREFIXES[self.engine.dialect.name] + statement, parameters or ())
+            rows = result.all()
+        if self.engine.dialect.name == "sqlite":
+            # (id, parent, notused, detail)
+            return "\n".join(row[-1] for row in rows)
+        return "\n".join(row[0] for row in rows)
+
+    @staticmethod
+    def log(report: dict, plan: str | None):
+        logger.warning(
+            "slow query %.0f ms on %s%s: %s | params: %s%s",
+            report["ms"], report["route"],
+            f" (+{report['suppressed']} similar)" if report["suppressed"] else "",
+            report["statement"][:2000], report["shape"],
+            f"\n{plan}" if plan else "",
+        )
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._explain_engine is not None:
+            await self._explain_engine.dispose()
+
+
+def install_slow_query_log(engine: AsyncEngine) -> SlowQueryLog:
+    slow_query_log = SlowQueryLog(engine, SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_EXPLAIN)
+    slow_query_log.install()
+    return slow_query_log
@@ -0,0 +1,144 @@
+import asyncio
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import HTTPException, Request, status
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# room for the multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD = 16 * 1024
+SNIFF_BYTES = 16
+
+# magic bytes -> content type
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def sniff_image_type(head: bytes) -> str | None:
+    """
+    Визначає тип зображення за першими байтами файлу.
+    """
+    for signature, content_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+@dataclass
+class SpooledUpload:
+    path: Path
+    content_type: str
+    size: int
+
+    def remove(self):
+        self.path.unlink(missing_ok=True)
+
+
+async def receive_upload(request: Request, field: str, max_bytes: int, allowed_types) -> SpooledUpload:
+    """
+    Читає файл із multipart-запиту потоком у тимчасовий файл.
+
+    Тіло не буферизується повністю: розмір перевіряється на кожному
+    фрагменті, тип — за сигнатурою перших байтів, а запис на диск
+    виконується в пулі потоків, щоб не блокувати event loop.
+
+    Args:
+        request (Request): HTTP-запит з тілом ``multipart/form-data``.
+        field (str): Ім'я поля з файлом.
+        max_bytes (int): Максимальний розмір файлу.
+        allowed_types: Дозволені типи зображень.
+
+    Returns:
+        SpooledUpload: Шлях до тимчасового файлу, тип і розмір. Файл видаляє викликач.
+
+    Raises:
+        HTTPException: 413, якщо файл завеликий; 415 — якщо тип не дозволений;
+            400 — якщо тіло не містить поля з файлом.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Use multipart/form-data")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"File is larger than {max_bytes} bytes")
+
+    part = {"headers": {}, "field": b"", "target": False}
+    chunks = []
+
+    def on_part_begin():
+        part.update(headers={}, field=b"", target=False)
+
+    def on_header_field(data, start, end):
+        part["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        name = part["field"].lower()
+        part["headers"][name] = part["headers"].get(name, b"") + data[start:end]
+
+    def on_header_end():
+        part["field"] = b""
+
+    def on_headers_finished():
+        _, options = parse_options_header(part["headers"].get(b"content-disposition", b""))
+        part["target"] = options.get(b"name") == field.encode() and b"filename" in options
+
+    def on_part_data(data, start, end):
+        if part["target"]:
+            chunks.append(data[start:end])
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+    })
+
+    fd, name = tempfile.mkstemp(prefix="upload-")
+    upload = SpooledUpload(Path(name), "", 0)
+
+    def check_type(head: bytes):
+        upload.content_type = sniff_image_type(head) or "application/octet-stream"
+        if upload.content_type not in allowed_types:
+            raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Unsupported image type")
+
+    try:
+        with os.fdopen(fd, "wb") as out:
+            head = b""
+            async for body_chunk in request.stream():
+                parser.write(body_chunk)
+                if not chunks:
+                    continue
+                data = b"".join(chunks)
+                chunks.clear()
+                upload.size += len(data)
+                if upload.size > max_bytes:
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"File is larger than {max_bytes} bytes")
+                if not upload.content_type:
+                    head += data[:SNIFF_BYTES]
+                    if len(head) >= SNIFF_BYTES:
+                        check_type(head)
+                await asyncio.to_thread(out.write, data)
+            parser.finalize()
+        if not upload.size:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Field '{field}' with a file is required")
+        if not upload.content_type:
+            check_type(head)
+    except MultipartParseError:
+        upload.remove()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed multipart body")
+    except BaseException:
+        upload.remove()
+        raise
+    return upload
@@ -0,0 +1,106 @@
+"""
+Воркер, що відправляє листи з таблиці ``email_outbox``.
+
+API лише записує лист в outbox у тій самій транзакції, що й зміни
+користувача; воркер забирає листи пачками, відправляє їх через одну
+SMTP-сесію і повторює невдалі спроби з експоненційною затримкою.
+Можна запускати кілька воркерів (на PostgreSQL рядки блокуються
+``FOR UPDATE SKIP LOCKED``)::
+
+    python -m contacts_api.workers.email_outbox
+
+З ``EMAIL_WORKER_METRICS_PORT`` воркер віддає свої метрики Prometheus на
+цьому порту (або пише їх у спільний ``PROMETHEUS_MULTIPROC_DIR``).
+"""
+import argparse
+import asyncio
+import logging
+import os
+
+from prometheus_client import start_http_server
+
+from ..database import AsyncSessionLocal
+from ..repository import outbox as repository_outbox
+from ..utils.email_sender import SMTPPool, build_verification_email, smtp_pool
+from ..utils.metrics import EMAIL_FAILURES, EMAILS_SENT, metrics_registry
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 50))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", 2))
+# a claimed message is handed to another worker if not finished within the lease
+OUTBOX_LEASE = float(os.getenv("OUTBOX_LEASE", 300))
+OUTBOX_BACKOFF = float(os.getenv("OUTBOX_BACKOFF", 30))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 8))
+EMAIL_WORKER_METRICS_PORT = int(os.getenv("EMAIL_WORKER_METRICS_PORT") or 0)
+
+logger = logging.getLogger(__name__)
+
+# kind -> builder of the MIME message
+BUILDERS = {
+    "email_verify": lambda message: build_verification_email(message.to_email, message.payload["verify_link"]),
+}
+
+
+async def process_batch(session_factory=AsyncSessionLocal, pool: SMTPPool = smtp_pool,
+                        batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """
+    Забирає і відправляє одну пачку листів.
+
+    Returns:
+        int: Кількість забраних листів (0, якщо черга порожня).
+    """
+    async with session_factory() as db:
+        messages = await repository_outbox.claim_batch(db, batch_size, OUTBOX_LEASE)
+        if not messages:
+            return 0
+
+        to_send, failed = [], []
+        for message in messages:
+            builder = BUILDERS.get(message.kind)
+            if builder is None:
+                failed.append((message, f"unknown kind {message.kind!r}"))
+            else:
+                to_send.append((message, builder(message)))
+
+        results = await pool.send_many([mime for _, mime in to_send])
+        sent = []
+        for (message, _), error in zip(to_send, results):
+            if error is None:
+                sent.append(message.id)
+                EMAILS_SENT.labels(message.kind).inc()
+            else:
+                failed.append((message, repr(error)))
+
+        await repository_outbox.mark_sent(sent, db)
+        for message, error in failed:
+            EMAIL_FAILURES.labels(message.kind).inc()
+            logger.warning("outbox message %s to %s failed (attempt %s): %s",
+                           message.id, message.to_email, message.attempts, error)
+            await repository_outbox.mark_failed(message, error, db, OUTBOX_BACKOFF, OUTBOX_MAX_ATTEMPTS)
+        return len(messages)
+
+
+async def run(once: bool = False):
+    """
+    Відправляє листи, поки черга не порожня, потім чекає ``OUTBOX_POLL_INTERVAL``.
+    """
+    try:
+        while True:
+            claimed = await process_batch()
+            if claimed:
+                logger.info("outbox: processed %s messages", claimed)
+                continue
+            if once:
+                break
+            await asyncio.sleep(OUTBOX_POLL_INTERVAL)
+    finally:
+        await smtp_pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Email outbox worker")
+    parser.add_argument("--once", action="store_true", help="drain the queue and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if EMAIL_WORKER_METRICS_PORT:
+        start_http_server(EMAIL_WORKER_METRICS_PORT, registry=metrics_registry())
+    asyncio.run(run(once=args.once))
@@ -0,0 +1,30 @@
+"""add contacts keyset indexes
+
+Revision ID: 3f1a9c2d7b45
+Revises: cbd7cc399702
+Create Date: 2026-10-18 10:12:40.512331
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a9c2d7b45'
+down_revision: Union[str, Sequence[str], None] = 'cbd7cc399702'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_contacts_owner_id_id', 'contacts', ['owner_id', 'id'], unique=False)
+    op.create_index('ix_contacts_owner_id_name_id', 'contacts', ['owner_id', 'name', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contacts_owner_id_name_id', table_name='contacts')
+    op.drop_index('ix_contacts_owner_id_id', table_name='contacts')
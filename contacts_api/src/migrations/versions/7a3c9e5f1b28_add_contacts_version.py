@@ -0,0 +1,28 @@
+"""add contacts version
+
+Revision ID: 7a3c9e5f1b28
+Revises: 5d2b8f0e3a71
+Create Date: 2026-10-18 17:26:03.917254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3c9e5f1b28'
+down_revision: Union[str, Sequence[str], None] = '5d2b8f0e3a71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('contacts', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('contacts', 'version')
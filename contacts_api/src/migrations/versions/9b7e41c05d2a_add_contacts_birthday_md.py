@@ -0,0 +1,40 @@
+"""add contacts birthday_md
+
+Revision ID: 9b7e41c05d2a
+Revises: 3f1a9c2d7b45
+Create Date: 2026-10-18 11:03:15.208771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b7e41c05d2a'
+down_revision: Union[str, Sequence[str], None] = '3f1a9c2d7b45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('contacts', sa.Column('birthday_md', sa.SmallInteger(), nullable=True))
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(
+            "UPDATE contacts SET birthday_md = CAST(strftime('%m%d', birthday) AS INTEGER) "
+            "WHERE birthday IS NOT NULL"
+        )
+    else:
+        op.execute(
+            "UPDATE contacts SET birthday_md = EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday) "
+            "WHERE birthday IS NOT NULL"
+        )
+    op.create_index('ix_contacts_owner_id_birthday_md', 'contacts', ['owner_id', 'birthday_md'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contacts_owner_id_birthday_md', table_name='contacts')
+    op.drop_column('contacts', 'birthday_md')
@@ -0,0 +1,66 @@
+"""add contacts search indexes
+
+Revision ID: c4e8d15a6f93
+Revises: 9b7e41c05d2a
+Create Date: 2026-10-18 12:26:51.734102
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8d15a6f93'
+down_revision: Union[str, Sequence[str], None] = '9b7e41c05d2a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_TSVECTOR = (
+    "to_tsvector('simple'::regconfig, coalesce(name, '') || ' ' || coalesce(email, '') "
+    "|| ' ' || coalesce(phone, '') || ' ' || coalesce(about, ''))"
+)
+SEARCH_TRGM = "(coalesce(name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(phone, ''))"
+FTS_COLUMNS = "name, email, phone, about"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(
+            f"CREATE VIRTUAL TABLE contacts_fts USING fts5({FTS_COLUMNS}, content='contacts', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER contacts_fts_ai AFTER INSERT ON contacts BEGIN "
+            f"INSERT INTO contacts_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, new.name, new.email, new.phone, new.about); END"
+        )
+        op.execute(
+            "CREATE TRIGGER contacts_fts_ad AFTER DELETE ON contacts BEGIN "
+            f"INSERT INTO contacts_fts(contacts_fts, rowid, {FTS_COLUMNS}) "
+            "VALUES ('delete', old.id, old.name, old.email, old.phone, old.about); END"
+        )
+        op.execute(
+            "CREATE TRIGGER contacts_fts_au AFTER UPDATE ON contacts BEGIN "
+            f"INSERT INTO contacts_fts(contacts_fts, rowid, {FTS_COLUMNS}) "
+            "VALUES ('delete', old.id, old.name, old.email, old.phone, old.about); "
+            f"INSERT INTO contacts_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, new.name, new.email, new.phone, new.about); END"
+        )
+        # index the rows that already exist
+        op.execute("INSERT INTO contacts_fts(contacts_fts) VALUES ('rebuild')")
+    else:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(f"CREATE INDEX ix_contacts_search_tsv ON contacts USING gin ({SEARCH_TSVECTOR})")
+        op.execute(f"CREATE INDEX ix_contacts_search_trgm ON contacts USING gin ({SEARCH_TRGM} gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in ('contacts_fts_au', 'contacts_fts_ad', 'contacts_fts_ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS contacts_fts")
+    else:
+        op.execute("DROP INDEX IF EXISTS ix_contacts_search_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_contacts_search_tsv")
@@ -0,0 +1,47 @@
+"""scope search indexes by owner
+
+Revision ID: d1f6a2b8c930
+Revises: 7a3c9e5f1b28
+Create Date: 2026-10-18 21:04:37.281946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1f6a2b8c930'
+down_revision: Union[str, Sequence[str], None] = '7a3c9e5f1b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_TSVECTOR = (
+    "to_tsvector('simple'::regconfig, coalesce(name, '') || ' ' || coalesce(email, '') "
+    "|| ' ' || coalesce(phone, '') || ' ' || coalesce(about, ''))"
+)
+SEARCH_TRGM = "(coalesce(name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(phone, ''))"
+
+
+def create_search_indexes(columns: str) -> None:
+    op.execute("DROP INDEX IF EXISTS ix_contacts_search_tsv")
+    op.execute("DROP INDEX IF EXISTS ix_contacts_search_trgm")
+    op.execute(f"CREATE INDEX ix_contacts_search_tsv ON contacts USING gin ({columns}{SEARCH_TSVECTOR})")
+    op.execute(f"CREATE INDEX ix_contacts_search_trgm ON contacts USING gin ({columns}{SEARCH_TRGM} gin_trgm_ops)")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        # FTS5 rows are joined to contacts and filtered by owner_id there
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    create_search_indexes("owner_id, ")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    create_search_indexes("")
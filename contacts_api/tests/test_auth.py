@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from fastapi import HTTPException
+
+from src.contacts_api.services import auth
+from src.contacts_api.services.auth import Auth
+from src.contacts_api.services.user_cache import user_cache
+
+
+class TestRunHashing(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.auth = Auth()
+
+    async def test_hash_runs_in_executor(self):
+        thread = await self.auth.run_hashing(lambda: threading.current_thread().name)
+
+        self.assertTrue(thread.startswith("bcrypt"))
+        self.assertEqual(self.auth.hash_pending, 0)
+
+    async def test_full_queue_is_rejected(self):
+        release = threading.Event()
+        with patch.object(auth, "HASH_WORKERS", 1), patch.object(auth, "HASH_MAX_QUEUE", 1):
+            running = [asyncio.create_task(self.auth.run_hashing(release.wait)) for _ in range(2)]
+            await asyncio.sleep(0)
+
+            with self.assertRaises(HTTPException) as raised:
+                await self.auth.run_hashing(release.wait)
+
+            release.set()
+            await asyncio.gather(*running)
+
+        self.assertEqual(raised.exception.status_code, 503)
+        self.assertEqual(raised.exception.headers, {"Retry-After": "1"})
+        self.assertEqual(self.auth.hash_pending, 0)
+
+
+class TestGetCurrentUser(unittest.IsolatedAsyncioTestCase):
+    EMAIL = "cached@example.com"
+
+    async def asyncSetUp(self):
+        self.auth = Auth()
+        self.token = await self.auth.create_access_token({"sub": self.EMAIL})
+        self.addCleanup(user_cache.pop, self.EMAIL)
+
+    def db_user(self, is_verified):
+        return SimpleNamespace(id=1, email=self.EMAIL, username="cached", is_verified=is_verified, avatar=None)
+
+    async def test_unverified_user_is_not_cached(self):
+        lookup = AsyncMock(side_effect=[self.db_user(False), self.db_user(True)])
+        with patch.object(auth.repository_users, "get_user_by_email", lookup):
+            with self.assertRaises(HTTPException) as raised:
+                await self.auth.get_current_user(self.token, None)
+            # confirmed by another worker: this one must not keep serving the stale flag
+            user = await self.auth.get_current_user(self.token, None)
+            await self.auth.get_current_user(self.token, None)
+
+        self.assertEqual(raised.exception.status_code, 403)
+        self.assertTrue(user.is_verified)
+        self.assertEqual(lookup.await_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
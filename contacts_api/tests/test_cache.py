@@ -0,0 +1,46 @@
+import unittest
+from unittest.mock import patch
+
+from src.contacts_api.utils.cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = TTLCache(maxsize=2, ttl=10, name="test")
+
+    def test_hit_and_miss_counters(self):
+        self.cache.set("a", 1)
+
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(len(self.cache), 2)
+
+    def test_entries_expire(self):
+        with patch("src.contacts_api.utils.cache.time.monotonic", return_value=100):
+            self.cache.set("a", 1)
+            self.cache.set("b", 2, ttl=50)
+        with patch("src.contacts_api.utils.cache.time.monotonic", return_value=120):
+            self.assertIsNone(self.cache.get("a"))
+            self.assertEqual(self.cache.get("b"), 2)
+
+    def test_pop(self):
+        self.cache.set("a", 1)
+        self.cache.pop("a")
+        self.cache.pop("missing")
+
+        self.assertIsNone(self.cache.get("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,257 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.contacts_api import crud, models, schemas
+from src.contacts_api.database import Base, get_db
+from src.contacts_api.routers import contacts
+from src.contacts_api.services.auth import auth_service
+from src.contacts_api.utils import contact_io
+from src.contacts_api.utils.contact_io import (
+    EXPORT_COLUMNS,
+    iter_contact_batches,
+    iter_csv_records,
+    iter_export_chunks,
+    iter_lines,
+)
+from src.contacts_api.utils.limiter import limiter
+from src.contacts_api.utils.response_cache import MemoryGenerations, response_cache
+
+HEADER = "name,email,phone,about\n"
+
+
+async def stream(*parts):
+    for part in parts:
+        yield part
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+class TestIterLines(unittest.IsolatedAsyncioTestCase):
+    async def test_chunk_boundaries(self):
+        text = "перший\r\nдругий\nтретій"
+        data = text.encode()
+        for split in range(1, len(data)):
+            with self.subTest(split=split):
+                lines = await collect(iter_lines(stream(data[:split], data[split:])))
+                self.assertEqual(lines, ["перший", "другий", "третій"])
+
+    async def test_strips_bom(self):
+        self.assertEqual(await collect(iter_lines(stream(b"\xef\xbb", b"\xbfname\n"))), ["name"])
+
+
+class TestIterCsvRecords(unittest.IsolatedAsyncioTestCase):
+    async def records(self, text):
+        return await collect(iter_csv_records(iter_lines(stream(text.encode()))))
+
+    async def test_quoted_field_spans_lines(self):
+        records = await self.records(HEADER + 'Ann,ann@example.com,1,"line one\nline ""two"""\nBob,bob@example.com,2,\n')
+
+        self.assertEqual(records, [
+            (1, {"name": "Ann", "email": "ann@example.com", "phone": "1", "about": 'line one\nline "two"'}),
+            (2, {"name": "Bob", "email": "bob@example.com", "phone": "2", "about": None}),
+        ])
+
+    async def test_unbalanced_quote_at_eof(self):
+        records = await self.records(HEADER + 'Ann,ann@example.com,1,"open\nBob,bob@example.com,2,\n')
+
+        self.assertEqual(records, [(1, None)])
+
+    async def test_unbalanced_quote_is_bounded(self):
+        lines = HEADER + 'Ann,ann@example.com,1,"open\n' + "".join(f"N{i},n{i}@example.com,{i},\n" for i in range(4))
+        with patch.object(contact_io, "CSV_MAX_RECORD_LINES", 3):
+            records = await self.records(lines + "Bob,bob@example.com,2,\n")
+
+        self.assertEqual(records[0], (1, None))
+        self.assertEqual(records[-1][1]["name"], "Bob")
+
+
+class TestIterContactBatches(unittest.IsolatedAsyncioTestCase):
+    async def batches(self, text, fmt, batch_size):
+        return await collect(iter_contact_batches(stream(text.encode()), fmt, batch_size))
+
+    async def test_batch_size_boundaries(self):
+        rows = "".join(f"N{i},n{i}@example.com,{i},\n" for i in range(4))
+
+        exact = await self.batches(HEADER + rows, "csv", 2)
+        self.assertEqual([(len(valid), len(errors)) for valid, errors in exact], [(2, 0), (2, 0)])
+        remainder = await self.batches(HEADER + rows, "csv", 3)
+        self.assertEqual([(len(valid), len(errors)) for valid, errors in remainder], [(3, 0), (1, 0)])
+        self.assertEqual([row for row, _ in remainder[1][0]], [4])
+
+    async def test_errors_count_towards_batch(self):
+        text = '{"name": "Ann", "email": "a@example.com", "phone": "1"}\n[1, 2]\n"text"\n{broken\n{"name": "Bob"}\n'
+
+        batches = await self.batches(text, "ndjson", 2)
+
+        self.assertEqual([(len(valid), len(errors)) for valid, errors in batches], [(1, 1), (0, 2), (0, 1)])
+        errors = [error for _, batch_errors in batches for error in batch_errors]
+        self.assertEqual([error["row"] for error in errors], [2, 3, 4, 5])
+        self.assertEqual(errors[0]["errors"], ["Malformed ndjson record"])
+        self.assertTrue(errors[-1]["errors"][0].startswith("email:"))
+
+
+class TestIterExportChunks(unittest.IsolatedAsyncioTestCase):
+    ROWS = [(1, "Ann", "ann@example.com", "1", date(1990, 2, 3), 'says "hi",\nbye'), (2, "Bob", "b@example.com", "2", None, None)]
+
+    async def test_csv_header_and_rows(self):
+        chunks = await collect(iter_export_chunks(stream(self.ROWS[:1], self.ROWS[1:]), "csv"))
+
+        self.assertEqual(len(chunks), 2)
+        rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+        self.assertEqual(rows, [
+            list(EXPORT_COLUMNS),
+            ["1", "Ann", "ann@example.com", "1", "1990-02-03", 'says "hi",\nbye'],
+            ["2", "Bob", "b@example.com", "2", "", ""],
+        ])
+
+    async def test_csv_without_rows_has_header(self):
+        self.assertEqual(await collect(iter_export_chunks(stream(), "csv")), [b"id,name,email,phone,birthday,about\n"])
+
+    async def test_ndjson_dates(self):
+        chunks = await collect(iter_export_chunks(stream(self.ROWS), "ndjson"))
+
+        records = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+        self.assertEqual(records[0]["birthday"], "1990-02-03")
+        self.assertEqual(records[1], dict(zip(EXPORT_COLUMNS, (2, "Bob", "b@example.com", "2", None, None))))
+
+
+class RouteTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self.tmp.name, 'import.db')}")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+
+        async def override_db():
+            async with sessions() as session:
+                yield session
+
+        app = FastAPI()
+        app.include_router(contacts.router)
+        app.dependency_overrides[get_db] = override_db
+        app.dependency_overrides[auth_service.get_current_user] = lambda: schemas.CurrentUser(
+            id=1, email="owner@example.com", username="owner"
+        )
+        self.sessions = sessions
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        self.patches = [
+            patch.object(limiter, "enabled", False),
+            patch.object(contacts, "IMPORT_BATCH_SIZE", 2),
+            patch.object(contacts, "EXPORT_BATCH_SIZE", 2),
+            patch.object(contacts, "AsyncSessionLocal", sessions),
+            patch.object(response_cache, "generations", MemoryGenerations()),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+
+    async def asyncTearDown(self):
+        for patcher in self.patches:
+            patcher.stop()
+        await self.client.aclose()
+        await self.engine.dispose()
+        self.tmp.cleanup()
+
+    async def count(self):
+        async with self.sessions() as session:
+            return await session.scalar(select(func.count()).select_from(models.Contacts))
+
+
+class TestImportRoute(RouteTestCase):
+    async def post(self, text, content_type="text/csv"):
+        return await self.client.post("/contacts/import", content=text.encode(), headers={"Content-Type": content_type})
+
+    async def test_imports_valid_rows_and_reports_errors(self):
+        text = "\ufeff" + HEADER + "Ann,ann@example.com,1,\nBob,,2,\n\"Eve\",eve@example.com,3,\"multi\nline\"\n"
+
+        response = await self.post(text)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["imported"], 2)
+        self.assertEqual([error["row"] for error in response.json()["errors"]], [2])
+        self.assertEqual(await self.count(), 2)
+
+    async def test_unsupported_content_type(self):
+        response = await self.post("{}", content_type="application/json")
+
+        self.assertEqual(response.status_code, 415)
+
+    async def test_error_report_is_capped(self):
+        with patch.object(contacts, "IMPORT_MAX_ERRORS", 2):
+            response = await self.post("[]\n" * 5, content_type="application/x-ndjson")
+
+        self.assertEqual(response.json(), {
+            "imported": 0,
+            "failed": 5,
+            "errors": [{"row": 1, "errors": ["Malformed ndjson record"]}, {"row": 2, "errors": ["Malformed ndjson record"]}],
+            "errors_truncated": True,
+        })
+
+    async def test_failed_batch_is_rolled_back(self):
+        bulk_create_contacts = crud.bulk_create_contacts
+        calls = []
+
+        async def fail_second_batch(db, bodies, user_id):
+            calls.append(len(bodies))
+            if len(calls) == 2:
+                # the rows reach the database before the failure, so only a rollback removes them
+                await db.execute(insert(models.Contacts), [crud.contact_values(body, user_id) for body in bodies])
+                raise RuntimeError("connection lost")
+            return await bulk_create_contacts(db, bodies, user_id)
+
+        text = HEADER + "".join(f"N{i},n{i}@example.com,{i},\n" for i in range(5))
+        with patch.object(crud, "bulk_create_contacts", fail_second_batch):
+            response = await self.post(text)
+
+        self.assertEqual(response.json()["imported"], 3)
+        self.assertEqual(response.json()["errors"], [
+            {"row": 3, "errors": ["Database error: RuntimeError"]},
+            {"row": 4, "errors": ["Database error: RuntimeError"]},
+        ])
+        self.assertEqual(await self.count(), 3)
+
+
+class TestExportRoute(RouteTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        async with self.sessions() as session:
+            await session.execute(insert(models.Contacts), [
+                {"name": f"N{i}", "email": f"n{i}@example.com", "phone": str(i), "birthday": date(2000, 1, i + 1),
+                 "owner_id": 1 if i % 2 == 0 else 2}
+                for i in range(10)
+            ])
+            await session.commit()
+
+    async def test_streams_all_partitions_of_own_contacts(self):
+        response = await self.client.get("/contacts/export", params={"format": "ndjson"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([record["name"] for record in records], ["N0", "N2", "N4", "N6", "N8"])
+        self.assertEqual(records[1]["birthday"], "2000-01-03")
+
+    async def test_csv(self):
+        response = await self.client.get("/contacts/export", params={"format": "csv"})
+
+        self.assertEqual(response.headers["content-disposition"], 'attachment; filename="contacts.csv"')
+        rows = list(csv.reader(io.StringIO(response.text)))
+        self.assertEqual(rows[0], list(EXPORT_COLUMNS))
+        self.assertEqual([row[1] for row in rows[1:]], ["N0", "N2", "N4", "N6", "N8"])
+
+
+if __name__ == "__main__":
+    unittest.main()
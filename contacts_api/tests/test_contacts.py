@@ -1,16 +1,26 @@
 import unittest
+from datetime import date
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 from src.contacts_api import crud,models,schemas
+from src.contacts_api.database import Base
+from src.contacts_api.utils.response_cache import MemoryGenerations, response_cache
 
-class TestContacts(unittest.TestCase):
+class TestContacts(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
-        self.db_mock = MagicMock()
+        self.db_mock = AsyncMock()
+        self.db_mock.add = MagicMock()
         self.fake_user = MagicMock()
         self.fake_user.id = 1
+        generations = patch.object(response_cache, "generations", MemoryGenerations())
+        generations.start()
+        self.addCleanup(generations.stop)
+
 
-       
         self.contact_data = schemas.ContactCreate(
             name="John",
             email="john@example.com",
@@ -26,49 +36,168 @@ class TestContacts(unittest.TestCase):
             birthday=None,
             about="Updated about"
         )
-    def test_create_contact(self,):
-   
-        result = crud.create_contact(self.contact_data,self.db_mock,self.fake_user)
+
+    def mock_first(self, value):
+        result = MagicMock()
+        result.scalars.return_value.first.return_value = value
+        self.db_mock.execute.return_value = result
+
+    async def test_create_contact(self,):
+
+        result = await crud.create_contact(self.contact_data,self.db_mock,self.fake_user)
 
         self.db_mock.add.assert_called_once()
-        self.db_mock.commit.assert_called_once()
-        self.db_mock.refresh.assert_called_once_with(result)
+        self.db_mock.commit.assert_awaited_once()
+        self.db_mock.refresh.assert_awaited_once_with(result)
 
         self.assertEqual(result.name,"John")
         self.assertEqual(result.email,"john@example.com")
 
-    def test_get_contact(self):
-        self.db_mock.query.return_value.filter.return_value.first.return_value = self.fake_user
+    async def test_get_contact(self):
+        self.mock_first(self.fake_user)
 
-        result = crud.get_contact(self.db_mock, 1)
-        
-        self.db_mock.query.assert_called_once_with(models.Contacts)
-        self.db_mock.query.return_value.filter.assert_called()
-        self.db_mock.query.return_value.filter.return_value.first.assert_called_once()
-    
-    def test_update_contact(self):
-        self.db_mock.query.return_value.filter.return_value.first.return_value = self.fake_user
+        result = await crud.get_contact(self.db_mock, 1)
 
-        result = crud.update_contact(self.db_mock,contact_id=1,contact=self.update_data)
+        self.db_mock.execute.assert_awaited_once()
+        self.db_mock.execute.return_value.scalars.return_value.first.assert_called_once()
+        self.assertEqual(result,self.fake_user)
+
+    async def test_update_contact(self):
+        self.mock_first(self.fake_user)
 
+        result = await crud.update_contact(self.db_mock,contact_id=1,contact=self.update_data,owner_id=1)
 
-        for key ,value in self.update_data.dict().items():
-            self.assertEqual(getattr(self.fake_user,key),value)
-        
-        self.db_mock.commit.assert_called_once()
-        self.db_mock.refresh.assert_called_once_with(self.fake_user)
+        self.db_mock.execute.assert_awaited_once()
+        statement = str(self.db_mock.execute.await_args.args[0])
+        self.assertIn("UPDATE contacts", statement)
+        self.assertIn("contacts.owner_id =", statement)
+        self.assertIn("version=(contacts.version +", statement)
+        self.assertIn("RETURNING", statement)
+        self.db_mock.commit.assert_awaited_once()
+        self.db_mock.refresh.assert_not_awaited()
 
         self.assertEqual(result,self.fake_user)
-    def test_delete_contact(self):
-        self.db_mock.query.return_value.filter.return_value.first.return_value =self.fake_user
 
-        result = crud.delete_contact(self.db_mock,contact_id=1)
+    async def test_update_contact_of_other_owner(self):
+        self.mock_first(None)
+
+        result = await crud.update_contact(self.db_mock,contact_id=1,contact=self.update_data,owner_id=2)
+
+        self.assertIsNone(result)
+
+    async def test_patch_contact_writes_only_changed_fields(self):
+        self.mock_first(self.fake_user)
 
-        self.db_mock.query.assert_called_once_with(models.Contacts)
-        self.db_mock.query.return_value.filter.assert_called()
-        self.db_mock.query.return_value.filter.return_value.first.assert_called_once()
+        result = await crud.patch_contact(self.db_mock,1,{"phone":"555","birthday":date(1990,12,31)},owner_id=1)
+
+        statement = self.db_mock.execute.await_args.args[0]
+        params = statement.compile().params
+        self.assertLessEqual({"phone", "birthday", "birthday_md"}, set(params))
+        self.assertNotIn("name", params)
+        self.assertIn("IS DISTINCT FROM", str(statement))
+        self.db_mock.commit.assert_awaited_once()
+        self.assertEqual(result,self.fake_user)
+
+    async def test_patch_contact_without_changes_skips_write(self):
+        self.mock_first(self.fake_user)
+
+        result = await crud.patch_contact(self.db_mock,1,{},owner_id=1)
+
+        self.assertIn("SELECT", str(self.db_mock.execute.await_args.args[0]))
+        self.db_mock.commit.assert_not_awaited()
         self.assertEqual(result,self.fake_user)
 
+    async def test_bulk_update_contacts_reports_each_item(self):
+        existing = models.Contacts(id=1, name="John", phone="1", owner_id=1, version=1)
+        unchanged = models.Contacts(id=2, name="Ann", phone="2", owner_id=1, version=1)
+        result = MagicMock()
+        result.scalars.return_value = [existing, unchanged]
+        self.db_mock.execute.return_value = result
+
+        results = await crud.bulk_update_contacts(
+            self.db_mock, {1: {"phone": "555"}, 2: {"name": "Ann"}, 3: {"phone": "0"}}, owner_id=1
+        )
+
+        self.assertEqual({key: status for key, (status, _) in results.items()}, {1: "updated", 2: "unchanged", 3: "not_found"})
+        self.assertEqual((existing.phone, existing.version), ("555", 2))
+        self.assertEqual(unchanged.version, 1)
+        self.db_mock.execute.assert_awaited_once()
+        self.db_mock.commit.assert_awaited_once()
+
+    async def test_delete_contact(self):
+        self.mock_first(self.fake_user)
+
+        result = await crud.delete_contact(self.db_mock,contact_id=1,owner_id=1)
+
+        self.db_mock.execute.assert_awaited_once()
+        statement = str(self.db_mock.execute.await_args.args[0])
+        self.assertIn("DELETE FROM contacts", statement)
+        self.assertIn("RETURNING", statement)
+        self.db_mock.delete.assert_not_awaited()
+        self.db_mock.commit.assert_awaited_once()
+        self.assertEqual(result,self.fake_user)
+
+    async def test_create_contact_sets_birthday_md(self):
+        self.contact_data.birthday = date(1990, 12, 31)
+
+        result = await crud.create_contact(self.contact_data,self.db_mock,self.fake_user)
+
+        self.assertEqual(result.birthday_md,1231)
+        self.assertIsNone(crud.birthday_month_day(None))
+
+    def test_fts5_query_quotes_terms(self):
+        self.assertEqual(crud.fts5_query('john "o\'neil'),'"john"* """o\'neil"*')
+        self.assertEqual(crud.fts5_query("   "),"")
+
+    def test_tsquery_prefix_quotes_terms(self):
+        self.assertEqual(crud.tsquery_prefix("j o'n\\"),"'j':* & 'o''n\\\\':*")
+        self.assertEqual(crud.tsquery_prefix("   "),"")
+
+    async def test_short_search_matches_prefix_only(self):
+        self.db_mock.connection.return_value.dialect.name = "postgresql"
+        self.db_mock.execute.return_value = MagicMock()
+
+        await crud.search_contacts(self.db_mock,1,"jo")
+
+        statement = self.db_mock.execute.await_args.args[0]
+        sql = str(statement)
+        self.assertIn("to_tsquery",sql)
+        self.assertNotIn("similarity",sql)
+        self.assertNotIn("ILIKE",sql.upper())
+        self.assertEqual(statement.compile().params["prefix"],"'jo':*")
+
+class TestUpcomingBirthdays(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        birthdays = [date(1990, 12, 30), date(1985, 1, 5), date(1980, 1, 6), date(1995, 6, 1)]
+        async with self.sessions() as session:
+            await session.execute(insert(models.Contacts), [
+                {"name": f"N{i}", "email": f"n{i}@example.com", "phone": str(i), "owner_id": 1,
+                 "birthday": birthday, "birthday_md": crud.birthday_month_day(birthday)}
+                for i, birthday in enumerate(birthdays)
+            ])
+            await session.commit()
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def names(self, days, today):
+        async with self.sessions() as session:
+            return [contact.name for contact in await crud.get_upcoming_birthdays(session, 1, days, today)]
+
+    async def test_window_counts_today_as_first_day(self):
+        today = date(2026, 12, 30)
+
+        self.assertEqual(await self.names(1, today), ["N0"])
+        # seven days from Dec 30 end on Jan 5; Jan 6 is the eighth day
+        self.assertEqual(await self.names(7, today), ["N0", "N1"])
+        self.assertEqual(await self.names(8, today), ["N0", "N1", "N2"])
+        self.assertEqual(await self.names(0, today), [])
+        self.assertEqual(await self.names(366, today), ["N0", "N1", "N2", "N3"])
+
+
 if __name__ == "__main__":
     unittest.main()
-    
\ No newline at end of file
@@ -0,0 +1,54 @@
+import unittest
+
+from src.contacts_api.utils.email_sender import SMTPPool, build_verification_email
+from src.contacts_api.utils.smtp_sink import SMTPSink
+
+
+class TestSMTPPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.sink = await SMTPSink().start()
+        self.pool = SMTPPool("127.0.0.1", self.sink.port, username="user", password="secret", use_tls=False, size=2)
+
+    async def asyncTearDown(self):
+        await self.pool.close()
+        await self.sink.stop()
+
+    async def test_send_renders_template(self):
+        results = await self.pool.send_many([build_verification_email("john@example.com", "http://localhost/verify?token=abc")])
+
+        self.assertEqual(results, [None])
+        self.assertEqual(len(self.sink.messages), 1)
+        message = self.sink.messages[0]
+        self.assertEqual(message["To"], "john@example.com")
+        html = message.get_payload()[0].get_payload(decode=True).decode()
+        self.assertIn("http://localhost/verify?token=abc", html)
+
+    async def test_connection_is_reused(self):
+        for i in range(3):
+            await self.pool.send_many([build_verification_email(f"user{i}@example.com", "http://link")])
+
+        self.assertEqual(len(self.sink.messages), 3)
+        self.assertEqual(self.sink.connections, 1)
+
+    async def test_send_many_uses_one_session(self):
+        messages = [build_verification_email(f"user{i}@example.com", "http://link") for i in range(5)]
+
+        results = await self.pool.send_many(messages)
+
+        self.assertEqual(results, [None] * 5)
+        self.assertEqual(len(self.sink.messages), 5)
+        self.assertEqual(self.sink.connections, 1)
+
+    async def test_reconnects_after_server_drop(self):
+        await self.pool.send_many([build_verification_email("a@example.com", "http://link")])
+        self.sink.drop_connections()
+
+        results = await self.pool.send_many([build_verification_email("b@example.com", "http://link")])
+
+        self.assertEqual(results, [None])
+        self.assertEqual([m["To"] for m in self.sink.messages], ["a@example.com", "b@example.com"])
+        self.assertEqual(self.sink.connections, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from unittest.mock import MagicMock
+
+from src.contacts_api.models import Contacts
+from src.contacts_api.utils.etag import contact_etag, if_match_versions, list_etag, not_modified
+
+
+def make_request(**headers):
+    request = MagicMock()
+    request.headers = headers
+    return request
+
+
+class TestETags(unittest.TestCase):
+    def setUp(self):
+        self.contact = Contacts(id=7, version=3)
+
+    def test_contact_etag_changes_with_version(self):
+        self.assertEqual(contact_etag(self.contact), '"7-3"')
+        self.assertNotEqual(list_etag([self.contact]), list_etag([Contacts(id=7, version=4)]))
+        self.assertNotEqual(list_etag([self.contact], None), list_etag([self.contact], "cursor"))
+
+    def test_not_modified(self):
+        self.assertEqual(not_modified(make_request(**{"if-none-match": 'W/"7-3", "x"'}), '"7-3"').status_code, 304)
+        self.assertIsNone(not_modified(make_request(**{"if-none-match": '"7-2"'}), '"7-3"'))
+        self.assertIsNone(not_modified(make_request(), '"7-3"'))
+
+    def test_if_match_versions(self):
+        self.assertIsNone(if_match_versions(make_request(), 7))
+        self.assertIsNone(if_match_versions(make_request(**{"if-match": "*"}), 7))
+        self.assertEqual(if_match_versions(make_request(**{"if-match": '"7-3", "8-1", W/"7-4"'}), 7), [3])
+        self.assertEqual(if_match_versions(make_request(**{"if-match": '"8-1"'}), 7), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
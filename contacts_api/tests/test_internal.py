@@ -0,0 +1,34 @@
+import unittest
+from unittest.mock import patch
+
+from fastapi import HTTPException
+
+from src.contacts_api.routers import internal
+from src.contacts_api.routers.internal import check_internal_token
+
+
+class TestCheckInternalToken(unittest.TestCase):
+    def assertForbidden(self, token):
+        with self.assertRaises(HTTPException) as raised:
+            check_internal_token(token)
+        self.assertEqual(raised.exception.status_code, 403)
+
+    def test_closed_without_configured_token(self):
+        with patch.object(internal, "INTERNAL_API_TOKEN", None), patch.object(internal, "INTERNAL_API_OPEN", False):
+            self.assertForbidden(None)
+            self.assertForbidden("anything")
+
+    def test_explicitly_opened(self):
+        with patch.object(internal, "INTERNAL_API_TOKEN", None), patch.object(internal, "INTERNAL_API_OPEN", True):
+            check_internal_token(None)
+
+    def test_token_must_match(self):
+        with patch.object(internal, "INTERNAL_API_TOKEN", "s3cret"), patch.object(internal, "INTERNAL_API_OPEN", True):
+            check_internal_token("s3cret")
+            self.assertForbidden(None)
+            self.assertForbidden("wrong")
+            self.assertForbidden("токен")
+
+
+if __name__ == "__main__":
+    unittest.main()
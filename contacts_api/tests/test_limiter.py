@@ -0,0 +1,104 @@
+import asyncio
+import os
+import sqlite3
+import stat
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import SlidingWindowCounterRateLimiter
+
+from src.contacts_api.services.auth import auth_service
+from src.contacts_api.utils.limiter import get_rate_limit_key
+import src.contacts_api.utils.limiter_storage  # noqa: F401
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.uri = f"sqlite:///{os.path.join(self.tmp.name, 'limits.db')}"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_sliding_window_limit(self):
+        limiter = SlidingWindowCounterRateLimiter(storage_from_string(self.uri))
+        item = parse("3/minute")
+
+        self.assertEqual([limiter.hit(item, "user:a") for _ in range(4)], [True, True, True, False])
+        self.assertTrue(limiter.hit(item, "user:b"))
+        self.assertEqual(limiter.get_window_stats(item, "user:a").remaining, 0)
+
+    def test_counters_are_shared_between_storages(self):
+        item = parse("2/minute")
+        first = SlidingWindowCounterRateLimiter(storage_from_string(self.uri))
+        second = SlidingWindowCounterRateLimiter(storage_from_string(self.uri))
+
+        self.assertTrue(first.hit(item, "user:a"))
+        self.assertTrue(second.hit(item, "user:a"))
+        self.assertFalse(first.hit(item, "user:a"))
+
+    def test_incr_restarts_expired_counter(self):
+        storage = storage_from_string(self.uri)
+
+        self.assertEqual(storage.incr("k", 60), 1)
+        self.assertEqual(storage.incr("k", 60, amount=2), 3)
+        self.assertEqual(storage.incr("expired", -1), 1)
+        self.assertEqual(storage.get("expired"), 0)
+        self.assertEqual(storage.incr("expired", 60), 1)
+
+    def test_file_is_private(self):
+        uri = f"sqlite:///{os.path.join(self.tmp.name, 'var', 'limits.db')}"
+        storage_from_string(uri).incr("k", 60)
+
+        path = os.path.join(self.tmp.name, "var", "limits.db")
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode), 0o700)
+
+    def test_locked_storage_fails_open(self):
+        limiter = SlidingWindowCounterRateLimiter(storage_from_string(self.uri))
+        item = parse("1/minute")
+        self.assertTrue(limiter.hit(item, "user:a"))
+
+        other = sqlite3.connect(self.uri[len("sqlite:///"):], isolation_level=None)
+        other.execute("BEGIN EXCLUSIVE")
+        try:
+            started = time.monotonic()
+            with self.assertLogs("src.contacts_api.utils.limiter_storage", level="WARNING"):
+                self.assertTrue(limiter.hit(item, "user:a"))
+            self.assertLess(time.monotonic() - started, 1)
+        finally:
+            other.execute("ROLLBACK")
+            other.close()
+        self.assertFalse(limiter.hit(item, "user:a"))
+
+
+class TestRateLimitKey(unittest.TestCase):
+    def make_request(self, authorization=None):
+        request = MagicMock()
+        request.headers = {"authorization": authorization} if authorization else {}
+        request.client.host = "10.0.0.1"
+        return request
+
+    def test_authenticated_user(self):
+        token = asyncio.run(auth_service.create_access_token({"sub": "john@example.com", "uid": 7}))
+
+        self.assertEqual(get_rate_limit_key(self.make_request(f"Bearer {token}")), "user:7")
+
+    def test_refresh_and_legacy_tokens_use_ip(self):
+        refresh = asyncio.run(auth_service.create_refresh_token({"sub": "john@example.com", "uid": 7}))
+        legacy = asyncio.run(auth_service.create_access_token({"sub": "john@example.com"}))
+
+        self.assertEqual(get_rate_limit_key(self.make_request(f"Bearer {refresh}")), "ip:10.0.0.1")
+        self.assertEqual(get_rate_limit_key(self.make_request(f"Bearer {legacy}")), "ip:10.0.0.1")
+
+    def test_anonymous_and_invalid_token_use_ip(self):
+        self.assertEqual(get_rate_limit_key(self.make_request()), "ip:10.0.0.1")
+        self.assertEqual(get_rate_limit_key(self.make_request("Bearer garbage")), "ip:10.0.0.1")
+
+
+if __name__ == "__main__":
+    unittest.main()
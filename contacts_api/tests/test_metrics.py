@@ -0,0 +1,73 @@
+import unittest
+from unittest.mock import patch
+
+from prometheus_client import REGISTRY
+
+from src.contacts_api.utils.cache import TTLCache
+from src.contacts_api.utils.metrics import MetricsMiddleware, ProcessStatsSync, render_metrics
+
+POOL = {"checked_out": 2, "idle": 3, "checkouts": 10, "timeouts": 0, "wait_total_ms": 5.0}
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestProcessStatsSync(unittest.TestCase):
+    def test_only_increments_are_added(self):
+        cache = TTLCache(maxsize=10, ttl=10, name="test_metrics")
+        sync = ProcessStatsSync(interval=0)
+        hits = sample("cache_hits_total", cache="test_metrics")
+        checkouts = sample("db_pool_checkouts_total")
+
+        with patch("src.contacts_api.utils.metrics.pool_status", return_value=POOL):
+            cache.set("a", 1)
+            cache.get("a")
+            sync()
+            cache.get("a")
+            sync()
+            sync()
+
+        self.assertEqual(sample("cache_hits_total", cache="test_metrics") - hits, 2)
+        self.assertEqual(sample("db_pool_checkouts_total") - checkouts, 10)
+        self.assertEqual(sample("db_pool_connections", state="checked_out"), 2)
+
+    def test_interval_throttles_syncs(self):
+        sync = ProcessStatsSync(interval=60)
+        with patch("src.contacts_api.utils.metrics.pool_status", return_value=POOL) as pool_status:
+            sync()
+            sync()
+            sync(force=True)
+
+        self.assertEqual(pool_status.call_count, 2)
+
+
+class TestMetricsMiddleware(unittest.IsolatedAsyncioTestCase):
+    async def test_counts_by_route_template(self):
+        route = type("Route", (), {"path": "/contacts/{contact_id}"})()
+
+        async def app(scope, receive, send):
+            scope["route"] = route
+            await send({"type": "http.response.start", "status": 404, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def send(message):
+            pass
+
+        labels = {"method": "GET", "route": "/contacts/{contact_id}", "status": "404"}
+        before = sample("http_requests_total", **labels)
+        with patch("src.contacts_api.utils.metrics.sync_process_stats"):
+            await MetricsMiddleware(app)({"type": "http", "method": "GET", "path": "/contacts/7"}, None, send)
+
+        self.assertEqual(sample("http_requests_total", **labels) - before, 1)
+        self.assertEqual(sample("http_requests_in_progress"), 0)
+
+    def test_render_exposition(self):
+        with patch("src.contacts_api.utils.metrics.pool_status", return_value=POOL):
+            body = render_metrics()
+
+        self.assertIn(b"# TYPE http_request_duration_seconds histogram", body)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.contacts_api.database import Base
+from src.contacts_api.models import EmailOutbox
+from src.contacts_api.repository.outbox import enqueue_email
+from src.contacts_api.utils.email_sender import SMTPPool
+from src.contacts_api.utils.smtp_sink import SMTPSink
+from src.contacts_api.workers.email_outbox import process_batch
+
+
+class TestEmailOutboxWorker(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.sink = await SMTPSink().start()
+
+    async def asyncTearDown(self):
+        await self.sink.stop()
+        await self.engine.dispose()
+
+    async def enqueue(self, count):
+        async with self.sessions() as db:
+            for i in range(count):
+                await enqueue_email(f"user{i}@example.com", "email_verify", {"verify_link": f"http://link/{i}"}, db)
+            await db.commit()
+
+    async def outbox(self):
+        async with self.sessions() as db:
+            return (await db.execute(select(EmailOutbox).order_by(EmailOutbox.id))).scalars().all()
+
+    async def test_batch_is_sent_over_one_connection(self):
+        await self.enqueue(3)
+        pool = SMTPPool("127.0.0.1", self.sink.port, use_tls=False)
+
+        claimed = await process_batch(self.sessions, pool, batch_size=10)
+        await pool.close()
+
+        self.assertEqual(claimed, 3)
+        self.assertEqual(len(self.sink.messages), 3)
+        self.assertEqual(self.sink.connections, 1)
+        self.assertTrue(all(row.status == "sent" and row.sent_at for row in await self.outbox()))
+        self.assertEqual(await process_batch(self.sessions, pool), 0)
+
+    async def test_failed_send_is_retried_later(self):
+        await self.enqueue(1)
+        port = self.sink.port
+        await self.sink.stop()
+        pool = SMTPPool("127.0.0.1", port, use_tls=False, timeout=1)
+
+        await process_batch(self.sessions, pool)
+
+        row = (await self.outbox())[0]
+        self.assertEqual(row.status, "pending")
+        self.assertEqual(row.attempts, 1)
+        self.assertGreater(row.next_attempt_at, datetime.utcnow())
+        self.assertIsNotNone(row.last_error)
+        self.assertEqual(await process_batch(self.sessions, pool), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
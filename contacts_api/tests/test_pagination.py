@@ -0,0 +1,22 @@
+import unittest
+
+from src.contacts_api.utils.pagination import decode_cursor, encode_cursor
+
+
+class TestCursor(unittest.TestCase):
+    def test_round_trip(self):
+        values = {"o": "name", "name": "Олена", "id": 42}
+        cursor = encode_cursor(values)
+
+        self.assertNotIn("=", cursor)
+        self.assertEqual(decode_cursor(cursor), values)
+
+    def test_invalid_cursor(self):
+        # not base64, a JSON list instead of an object, empty
+        for cursor in ("garbage!", "WzEsMl0", ""):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+from sqlalchemy import create_engine, text
+
+from src.contacts_api.utils.profiling import (
+    ProfilingMiddleware,
+    RequestProfile,
+    current_profile,
+    install_query_listeners,
+)
+
+
+class TestRequestProfile(unittest.TestCase):
+    def test_placeholder_lists_share_a_pattern(self):
+        profile = RequestProfile({"path": "/contacts/"})
+        profile.record("SELECT * FROM contacts WHERE id IN (?, ?, ?)", 0.001)
+        profile.record("SELECT * FROM contacts WHERE id IN (?, ?)", 0.002)
+        profile.record("SELECT * FROM contacts WHERE id IN (%(id_1)s, %(id_2)s)", 0.001)
+
+        self.assertEqual(profile.statements, 3)
+        self.assertAlmostEqual(profile.db_time, 0.004)
+        self.assertEqual(profile.repeated(threshold=2), [("SELECT * FROM contacts WHERE id IN (?)", 3)])
+
+    def test_route_template_is_preferred(self):
+        route = type("Route", (), {"path": "/contacts/{contact_id}"})()
+
+        self.assertEqual(RequestProfile({"path": "/contacts/5"}).route, "/contacts/5")
+        self.assertEqual(RequestProfile({"path": "/contacts/5", "route": route}).route, "/contacts/{contact_id}")
+
+    def test_listeners_record_only_inside_a_request(self):
+        engine = create_engine("sqlite://")
+        install_query_listeners(engine)
+        profile = RequestProfile({"path": "/"})
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            token = current_profile.set(profile)
+            try:
+                for _ in range(3):
+                    conn.execute(text("SELECT :x"), {"x": 1})
+            finally:
+                current_profile.reset(token)
+
+        self.assertEqual(profile.statements, 3)
+        self.assertEqual(profile.repeated(threshold=3), [("SELECT ?", 3)])
+
+
+class TestProfilingMiddleware(unittest.IsolatedAsyncioTestCase):
+    async def test_server_timing_header(self):
+        async def app(scope, receive, send):
+            current_profile.get().record("SELECT 1", 0.002)
+            await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await ProfilingMiddleware(app)({"type": "http", "method": "GET", "path": "/"}, None, send)
+
+        headers = dict(messages[0]["headers"])
+        self.assertIn(b'db;dur=2.0;desc="1 queries, 0 repeated"', headers[b"server-timing"])
+        self.assertIsNone(current_profile.get())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.contacts_api.utils.cache import TTLCache
+from src.contacts_api.utils.response_cache import CachedResponse, MemoryGenerations, ResponseCache, SQLiteGenerations
+
+
+class TestGenerations(unittest.IsolatedAsyncioTestCase):
+    async def test_memory_bump(self):
+        generations = MemoryGenerations()
+        await generations.bump(1)
+        await generations.bump(1)
+
+        self.assertEqual(await generations.get(1), 2)
+        self.assertEqual(await generations.get(2), 0)
+
+    async def test_sqlite_is_shared_between_instances(self):
+        path = os.path.join(tempfile.mkdtemp(), "var", "generations.db")
+        await SQLiteGenerations(path).bump(1)
+
+        self.assertEqual(await SQLiteGenerations(path).get(1), 1)
+        self.assertEqual(await SQLiteGenerations(path).get(2), 0)
+
+
+class TestCachedResponse(unittest.TestCase):
+    def request(self, **headers):
+        request = MagicMock()
+        request.headers = headers
+        return request
+
+    def test_not_modified_skips_serialization(self):
+        render = MagicMock(return_value=b"[]")
+        cached = CachedResponse('"abc"', render)
+
+        self.assertEqual(cached.response(self.request(**{"if-none-match": '"abc"'})).status_code, 304)
+        render.assert_not_called()
+        self.assertEqual(cached.response(self.request()).body, b"[]")
+        self.assertEqual(cached.response(self.request()).body, b"[]")
+        render.assert_called_once()
+
+
+class TestResponseCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.cache = ResponseCache(TTLCache(maxsize=10, ttl=10, name="test_response"), MemoryGenerations())
+
+    async def test_hit_until_owner_is_invalidated(self):
+        loader = AsyncMock(side_effect=["first", "second"])
+
+        self.assertEqual(await self.cache.get_or_load(1, ("contact", 5), loader), "first")
+        self.assertEqual(await self.cache.get_or_load(1, ("contact", 5), loader), "first")
+        await self.cache.invalidate(2)
+        self.assertEqual(await self.cache.get_or_load(1, ("contact", 5), loader), "first")
+        await self.cache.invalidate(1)
+        self.assertEqual(await self.cache.get_or_load(1, ("contact", 5), loader), "second")
+        self.assertEqual(loader.await_count, 2)
+
+    async def test_concurrent_misses_are_coalesced(self):
+        release = asyncio.Event()
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "page"
+
+        tasks = [asyncio.create_task(self.cache.get_or_load(1, ("list",), loader)) for _ in range(10)]
+        await asyncio.sleep(0)
+        release.set()
+
+        self.assertEqual(await asyncio.gather(*tasks), ["page"] * 10)
+        self.assertEqual(calls, 1)
+        self.assertEqual(self.cache.coalesced, 9)
+
+    async def test_errors_reach_waiters_and_are_not_cached(self):
+        release = asyncio.Event()
+
+        async def failing():
+            await release.wait()
+            raise ValueError("bad cursor")
+
+        tasks = [asyncio.create_task(self.cache.get_or_load(1, ("list",), failing)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(await self.cache.get_or_load(1, ("list",), AsyncMock(return_value="ok")), "ok")
+
+    async def test_waiter_loads_itself_when_leader_is_cancelled(self):
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        leader = asyncio.create_task(self.cache.get_or_load(1, ("list",), slow))
+        await started.wait()
+        waiter = asyncio.create_task(self.cache.get_or_load(1, ("list",), AsyncMock(return_value="page")))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        self.assertEqual(await waiter, "page")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+from datetime import date
+from types import SimpleNamespace
+
+from src.contacts_api import schemas
+from src.contacts_api.crud import CONTACT_ROW_COLUMNS
+from src.contacts_api.utils.serialization import contact_dict, contact_page_json
+
+
+class TestFastSerialization(unittest.TestCase):
+    def setUp(self):
+        self.contacts = [
+            SimpleNamespace(id=1, name="Ann", email="ann@example.com", phone="+380", birthday=date(1990, 5, 1), about="ї", version=3),
+            SimpleNamespace(id=2, name="Bob", email="bob@example.com", phone="1", birthday=None, about=None, version=1),
+        ]
+        self.rows = [tuple(getattr(contact, column.key) for column in CONTACT_ROW_COLUMNS) for contact in self.contacts]
+
+    def test_row_columns_follow_schema(self):
+        self.assertEqual([column.key for column in CONTACT_ROW_COLUMNS], [*schemas.Contact.model_fields, "version"])
+
+    def test_contact_dict_drops_version(self):
+        self.assertEqual(contact_dict(self.rows[1]), {
+            "name": "Bob", "email": "bob@example.com", "phone": "1", "birthday": None, "about": None, "id": 2,
+        })
+
+    def test_page_matches_pydantic_output(self):
+        page = schemas.ContactPage.model_validate({"items": self.contacts, "next_cursor": "abc"}, from_attributes=True)
+
+        self.assertEqual(contact_page_json(self.rows, "abc"), page.model_dump_json().encode())
+
+
+if __name__ == "__main__":
+    unittest.main()
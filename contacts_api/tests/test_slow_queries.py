@@ -0,0 +1,73 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.contacts_api.utils.slow_queries import SlowQueryLog, current_scope, parameters_shape
+
+
+class TestParametersShape(unittest.TestCase):
+    def test_values_are_not_logged(self):
+        self.assertEqual(
+            parameters_shape({"email": "ann@example.com", "ids": [1, 2, 3], "day": date(2000, 1, 1)}, False),
+            {"email": "str[15]", "ids": "list[3]", "day": "date"},
+        )
+        self.assertEqual(parameters_shape(("secret", 5), False), ["str[6]", "int"])
+        self.assertEqual(parameters_shape([(1,), (2,)], True), {"rows": 2, "first": ["int"]})
+
+
+class TestSlowQueryLog(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        path = os.path.join(tempfile.mkdtemp(), "slow.db")
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with self.engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE contacts (id INTEGER PRIMARY KEY, owner_id INTEGER)"))
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def test_logs_route_shape_and_plan(self):
+        slow_query_log = SlowQueryLog(self.engine, threshold_ms=0)
+        slow_query_log.install()
+        token = current_scope.set({"method": "GET", "path": "/contacts/"})
+        try:
+            with self.assertLogs("src.contacts_api.utils.slow_queries", level="WARNING") as logs:
+                async with self.engine.connect() as conn:
+                    await conn.execute(text("SELECT id FROM contacts WHERE owner_id = :owner"), {"owner": 1})
+                await asyncio.gather(*slow_query_log._tasks)
+        finally:
+            current_scope.reset(token)
+            await slow_query_log.close()
+
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("on GET /contacts/", logs.output[0])
+        self.assertIn("params: ['int']", logs.output[0])
+        self.assertIn("SCAN contacts", logs.output[0])
+
+    async def test_repeats_are_suppressed_and_counted(self):
+        slow_query_log = SlowQueryLog(self.engine, threshold_ms=0, explain=False, report_interval=60, max_reports=10)
+        with patch.object(SlowQueryLog, "log") as log:
+            for _ in range(3):
+                slow_query_log.record("SELECT 1 WHERE 1 IN (?, ?)", (1, 2), False, 1.5)
+            with patch("src.contacts_api.utils.slow_queries.time.monotonic", return_value=10**6):
+                slow_query_log.record("SELECT 1 WHERE 1 IN (?)", (1,), False, 1.5)
+
+        self.assertEqual(log.call_count, 2)
+        self.assertEqual(log.call_args.args[0]["suppressed"], 2)
+
+    async def test_reports_per_minute_are_capped(self):
+        slow_query_log = SlowQueryLog(self.engine, threshold_ms=0, explain=False, max_reports=2)
+        with patch.object(SlowQueryLog, "log") as log:
+            for i in range(5):
+                slow_query_log.record(f"SELECT {i}", (), False, 1.5)
+
+        self.assertEqual(log.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
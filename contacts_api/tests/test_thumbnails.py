@@ -0,0 +1,179 @@
+import io
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import httpx
+from fastapi import FastAPI
+from PIL import Image
+
+from src.contacts_api import schemas
+from src.contacts_api.database import get_db
+from src.contacts_api.routers import auth as auth_router
+from src.contacts_api.routers import avatars
+from src.contacts_api.routers.avatars import resized_url
+from src.contacts_api.services.auth import auth_service
+from src.contacts_api.services.thumbnails import ThumbnailCache, nearest_size, thumbnail_key
+
+
+class TestThumbnailCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.source = self.root / "source.png"
+        Image.new("RGB", (300, 200), (10, 120, 200)).save(self.source)
+        self.cache = ThumbnailCache(self.root / "thumbs", max_bytes=10 ** 6, workers=1)
+
+    async def asyncTearDown(self):
+        self.cache.shutdown()
+        self.tmp.cleanup()
+
+    async def test_generate_square_thumbnails(self):
+        await self.cache.generate(self.source, "abc", sizes=(32, 64))
+
+        path = self.cache.get("abc", 64)
+        self.assertIsNotNone(path)
+        with Image.open(path) as image:
+            self.assertEqual((image.format, image.size), ("WEBP", (64, 64)))
+        self.assertIsNone(self.cache.get("abc", 128))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    async def test_evicts_least_recently_used(self):
+        await self.cache.generate(self.source, "old", sizes=(64,))
+        await self.cache.generate(self.source, "new", sizes=(64,))
+        os.utime(self.cache.path("old", 64), (1, 1))
+        self.cache.max_bytes = int(os.path.getsize(self.cache.path("new", 64)) * 1.5)
+
+        self.cache.evict()
+
+        self.assertIsNone(self.cache.get("old", 64))
+        self.assertIsNotNone(self.cache.get("new", 64))
+
+    async def test_rename_skips_evicted_files(self):
+        await self.cache.generate(self.source, "upload", sizes=(32, 64))
+        os.unlink(self.cache.path("upload", 32))
+
+        self.cache.rename("upload", "final", sizes=(32, 64))
+
+        self.assertIsNone(self.cache.get("final", 32))
+        self.assertIsNotNone(self.cache.get("final", 64))
+
+    async def test_remove_deletes_every_size(self):
+        await self.cache.generate(self.source, "upload", sizes=(32, 64))
+        self.cache.evict()
+
+        # a size that was never written is skipped
+        self.cache.remove("upload", sizes=(32, 64, 128))
+
+        self.assertEqual(os.listdir(self.cache.root), [])
+        self.assertEqual(self.cache.stats()["size_bytes"], 0)
+
+    async def test_keys_cannot_leave_the_cache_root(self):
+        (self.root / "secret-64.webp").write_bytes(b"secret")
+
+        self.assertIsNone(self.cache.get("../secret", 64))
+        with self.assertRaises(ValueError):
+            self.cache.path("../secret", 64)
+
+
+class TestReadAvatar(unittest.IsolatedAsyncioTestCase):
+    VERSION = "0123456789abcdef"
+
+    async def asyncSetUp(self):
+        app = FastAPI()
+        app.include_router(avatars.router)
+        app.dependency_overrides[get_db] = lambda: None
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        self.tmp = tempfile.TemporaryDirectory()
+        source = Path(self.tmp.name) / "source.png"
+        Image.new("RGB", (80, 60), (10, 120, 200)).save(source)
+        self.cache = ThumbnailCache(Path(self.tmp.name) / "thumbs", max_bytes=10 ** 6, workers=1)
+        await self.cache.generate(source, thumbnail_key(1, self.VERSION), sizes=(64,))
+        cache = patch.object(avatars, "thumbnail_cache", self.cache)
+        cache.start()
+        self.addCleanup(cache.stop)
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        self.cache.shutdown()
+        self.tmp.cleanup()
+
+    async def test_version_is_served_without_database(self):
+        get_avatar = AsyncMock(return_value=None)
+        with patch.object(avatars.repository_users, "get_avatar", get_avatar):
+            response = await self.client.get("/avatars/1", params={"s": 64, "v": self.VERSION})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["cache-control"], avatars.IMMUTABLE)
+        get_avatar.assert_not_awaited()
+
+    async def test_version_of_another_user_is_not_served(self):
+        with patch.object(avatars.repository_users, "get_avatar", AsyncMock(return_value=None)):
+            response = await self.client.get("/avatars/2", params={"s": 64, "v": self.VERSION})
+
+        self.assertEqual(response.status_code, 404)
+
+    async def test_rejects_traversal_in_version(self):
+        with patch.object(avatars.repository_users, "get_avatar", AsyncMock(return_value=None)):
+            response = await self.client.get("/avatars/999", params={"s": 64, "v": "../../secret"})
+
+        self.assertEqual(response.status_code, 422)
+
+    async def test_unknown_version_is_not_modified_only_when_cached(self):
+        headers = {"If-None-Match": '"0123456789abcdef-64"'}
+        with patch.object(avatars.repository_users, "get_avatar", AsyncMock(return_value=None)):
+            response = await self.client.get("/avatars/999", params={"v": "0123456789abcdef"}, headers=headers)
+
+        self.assertEqual(response.status_code, 404)
+
+
+class TestUpdateAvatar(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ThumbnailCache(Path(self.tmp.name), max_bytes=10 ** 6, workers=1)
+        app = FastAPI()
+        app.include_router(auth_router.router)
+        app.dependency_overrides[get_db] = lambda: AsyncMock()
+        app.dependency_overrides[auth_service.get_current_user] = lambda: schemas.CurrentUser(
+            id=1, email="owner@example.com", username="owner"
+        )
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        image = io.BytesIO()
+        Image.new("RGB", (80, 60), (10, 120, 200)).save(image, "PNG")
+        self.image = image.getvalue()
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        self.cache.shutdown()
+        self.tmp.cleanup()
+
+    async def test_storage_failure_removes_upload_thumbnails(self):
+        save = AsyncMock(side_effect=OSError("storage is down"))
+        with patch.object(auth_router, "thumbnail_cache", self.cache), \
+                patch.object(auth_router.avatar_storage, "save", save):
+            response = await self.client.post("/auth/avatar", files={"file": ("a.png", self.image, "image/png")})
+
+        self.assertEqual(response.status_code, 502)
+        save.assert_awaited_once()
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+
+class TestAvatarHelpers(unittest.TestCase):
+    def test_nearest_size(self):
+        self.assertEqual(nearest_size(1), 32)
+        self.assertEqual(nearest_size(65), 128)
+        self.assertEqual(nearest_size(5000), 256)
+
+    def test_resized_url(self):
+        self.assertEqual(resized_url("https://www.gravatar.com/avatar/abc", 64), "https://www.gravatar.com/avatar/abc?s=64")
+        self.assertEqual(
+            resized_url("https://res.cloudinary.com/demo/image/upload/v1/avatars/1.png", 32),
+            "https://res.cloudinary.com/demo/image/upload/c_fill,w_32,h_32,f_auto/v1/avatars/1.png",
+        )
+        self.assertIsNone(resized_url("https://example.com/a.png", 32))
+
+
+if __name__ == "__main__":
+    unittest.main()
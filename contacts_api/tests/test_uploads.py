@@ -0,0 +1,73 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI, Request
+
+from src.contacts_api.services.storage import AVATAR_CONTENT_TYPES, LocalStorage
+from src.contacts_api.utils.uploads import receive_upload, sniff_image_type
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 200
+
+app = FastAPI()
+
+
+@app.post("/upload")
+async def upload(request: Request):
+    spooled = await receive_upload(request, "file", 1024, AVATAR_CONTENT_TYPES)
+    data = spooled.path.read_bytes()
+    spooled.remove()
+    return {"content_type": spooled.content_type, "size": spooled.size, "match": data == PNG}
+
+
+class TestReceiveUpload(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    async def test_streams_file_to_disk(self):
+        response = await self.client.post("/upload", data={"note": "x"}, files={"file": ("a.png", PNG, "image/png")})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"content_type": "image/png", "size": len(PNG), "match": True})
+
+    async def test_rejects_large_file(self):
+        response = await self.client.post("/upload", files={"file": ("a.png", PNG * 10, "image/png")})
+
+        self.assertEqual(response.status_code, 413)
+
+    async def test_rejects_non_image_despite_declared_type(self):
+        response = await self.client.post("/upload", files={"file": ("a.png", b"<html>" * 10, "image/png")})
+
+        self.assertEqual(response.status_code, 415)
+
+    async def test_requires_file_field(self):
+        response = await self.client.post("/upload", files={"other": ("a.png", PNG, "image/png")})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_sniff_webp(self):
+        self.assertEqual(sniff_image_type(b"RIFF\x00\x00\x00\x00WEBPVP8 "), "image/webp")
+
+
+class TestLocalStorage(unittest.IsolatedAsyncioTestCase):
+    async def test_save_replaces_previous_avatar(self):
+        with tempfile.TemporaryDirectory() as root:
+            storage = LocalStorage(Path(root), "http://media")
+            urls = []
+            for _ in range(2):
+                path = Path(root) / "upload"
+                path.write_bytes(PNG)
+                urls.append(await storage.save(path, 7, "image/png"))
+
+            files = list((Path(root) / "avatars").iterdir())
+            self.assertEqual([f.name for f in files], [urls[1].rsplit("/", 1)[1]])
+            self.assertTrue(urls[1].startswith("http://media/avatars/7-") and urls[1].endswith(".png"))
+            self.assertNotEqual(urls[0], urls[1])
+
+
+if __name__ == "__main__":
+    unittest.main()